@@ -3,6 +3,9 @@ from .settings import (
     BOT_NAME,
     BOT_TITLE,
     WAKE_WORDS,
+    WAKE_WORDS_SET,
+    match_wake_word,
+    extract_wake_command,
     USER_NAMES,
     PRIMARY_USER_NAME,
     OPENAI_API_KEY,
@@ -4,11 +4,17 @@ The Watchful Guardian's Core Configuration
 """
 
 import os
+import re
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Load environment variables once per process (module globals survive
+# importlib.reload, so a reload does not re-read .env from disk)
+if not globals().get("_DOTENV_LOADED", False):
+    load_dotenv()
+    _DOTENV_LOADED = True
 
 # =============================================================================
 # IDENTITY
@@ -18,7 +24,7 @@ BOT_NAME = "Vigil"
 BOT_TITLE = "The Watchful Guardian"
 
 # Wake words that activate Vigil (case-insensitive)
-WAKE_WORDS = [
+WAKE_WORDS = (
     "vigil",
     "hey vigil",
     "yo vigil",
@@ -26,20 +32,59 @@ WAKE_WORDS = [
     "yo vigil you with me",
     "the truth will set you free",
     "help",
-]
+)
+
+# Lowercased wake words for O(1) exact-phrase membership checks
+WAKE_WORDS_SET = frozenset(map(str.lower, WAKE_WORDS))
+
+# Single compiled pattern for all wake words: one linear scan per utterance.
+# Longest phrases come first so "yo vigil you with me" wins over "yo vigil".
+_WAKE_RE = re.compile(
+    r"\b(" + "|".join(map(re.escape, sorted(WAKE_WORDS, key=len, reverse=True))) + r")\b",
+    re.IGNORECASE,
+)
+
+
+def match_wake_word(text: str) -> Optional[str]:
+    """Return the first wake word found in text (lowercased), or None."""
+    match = _WAKE_RE.search(text)
+    return match.group(1).lower() if match else None
+
+
+def extract_wake_command(text: str) -> Optional[str]:
+    """
+    Return what follows the first wake word in text, trimmed of spaces and
+    trailing punctuation, or None if text holds no wake word.
+    """
+    match = _WAKE_RE.search(text)
+    if match is None:
+        return None
+    return text[match.end():].strip(" ,.?!")
+
 
 # User identities (Vigil recognizes all as the same person)
-USER_NAMES = ["Louis", "Bizy", "Lazurith"]
+USER_NAMES = ("Louis", "Bizy", "Lazurith")
 PRIMARY_USER_NAME = "Louis"
 
 # =============================================================================
 # API KEYS (loaded from environment)
 # =============================================================================
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
-POE_API_KEY = os.getenv("POE_API_KEY", "")
-ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY", "")
+# Snapshot the keys once so callers read plain module globals
+_ENV = {
+    key: os.environ.get(key, "")
+    for key in (
+        "OPENAI_API_KEY",
+        "ANTHROPIC_API_KEY",
+        "POE_API_KEY",
+        "ELEVENLABS_API_KEY",
+    )
+}
+
+OPENAI_API_KEY = _ENV["OPENAI_API_KEY"]
+ANTHROPIC_API_KEY = _ENV["ANTHROPIC_API_KEY"]
+POE_API_KEY = _ENV["POE_API_KEY"]
+ELEVENLABS_API_KEY = _ENV["ELEVENLABS_API_KEY"]
 
 # =============================================================================
 # LLM CONFIGURATION
@@ -61,6 +106,26 @@ class LLMConfig:
     CREATIVE_TEMPERATURE = 0.9
     PRECISE_TEMPERATURE = 0.3
 
+    # Response cache: a question repeated with the same conversation before
+    # it (e.g. in a fresh one) is answered locally instead of paying for
+    # another API call
+    RESPONSE_CACHE_SIZE = 128
+    RESPONSE_CACHE_TTL = 300  # seconds
+
+    # Prompt budget (tokens); oldest history is dropped to stay under it
+    CONTEXT_TOKEN_LIMIT = 128000
+
+    # Fallback chain: if a provider has not answered after this many seconds
+    # the next one is started in parallel and the first success wins.
+    # Full completions routinely take several seconds, so a short delay
+    # would double-bill most turns.
+    HEDGE_DELAY = 8.0
+
+    # Trinity synthesis is a merge step, not a creative one: keep it
+    # deterministic so identical inputs give identical requests
+    SYNTHESIS_TEMPERATURE = 0.0
+    SYNTHESIS_SEED = 42
+
 # =============================================================================
 # VOICE CONFIGURATION
 # =============================================================================
@@ -87,6 +152,22 @@ class VoiceConfig:
     # Wake word detection
     WAKE_WORD_SENSITIVITY = 0.5  # 0.0 to 1.0
     SILENCE_THRESHOLD = 500  # milliseconds of silence to stop recording
+    # Optional on-device wake-word pass. When configured, only phrases that
+    # contain a wake word locally are sent to Google STT for the transcript.
+    # openWakeWord model files (comma-separated) take precedence over Vosk;
+    # WAKE_WORD_SENSITIVITY is the openWakeWord score threshold.
+    OPENWAKEWORD_MODELS = tuple(
+        path for path in os.environ.get("OPENWAKEWORD_MODELS", "").split(",") if path
+    )
+    # Runtime for openWakeWord: "tflite" (tflite-runtime, INT8 models run on
+    # the CPU's integer dot-product units) or "onnx" (onnxruntime). The model
+    # files must match the framework.
+    OPENWAKEWORD_FRAMEWORK = os.environ.get("OPENWAKEWORD_FRAMEWORK", "tflite")
+    VOSK_MODEL_PATH = os.environ.get("VOSK_MODEL_PATH", "")
+    # Voice activity gate (webrtcvad, if installed): a phrase only goes on to
+    # wake-word screening with at least VAD_MIN_SPEECH_MS of continuous speech
+    VAD_AGGRESSIVENESS = 3  # 0 (lenient) to 3 (strict)
+    VAD_MIN_SPEECH_MS = 300
     
     # Audio settings
     SAMPLE_RATE = 16000
@@ -96,18 +177,40 @@ class VoiceConfig:
 # PATHS
 # =============================================================================
 
+class _LazyPath:
+    """Path under Paths.ROOT, built on first access and then cached on the class."""
+
+    def __init__(self, *parts: str):
+        self.parts = parts
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        path = owner.ROOT.joinpath(*self.parts)
+        # Replace the descriptor so later lookups are plain attribute reads
+        setattr(owner, self.name, path)
+        return path
+
+
 class Paths:
     ROOT = Path(__file__).parent.parent
-    CONFIG = ROOT / "config"
-    KNOWLEDGE = ROOT / "knowledge"
-    REFLECTION = ROOT / "reflection"
-    REFLECTION_LOGS = REFLECTION / "logs"
-    CORE = ROOT / "core"
+    CONFIG = _LazyPath("config")
+    KNOWLEDGE = _LazyPath("knowledge")
+    REFLECTION = _LazyPath("reflection")
+    REFLECTION_LOGS = _LazyPath("reflection", "logs")
+    CORE = _LazyPath("core")
+    
+    # Directories already created this process (skip repeat mkdir calls)
+    _ensured: set = set()
     
     # Ensure directories exist
     @classmethod
     def ensure_directories(cls):
+        if cls.REFLECTION_LOGS in cls._ensured:
+            return
         cls.REFLECTION_LOGS.mkdir(parents=True, exist_ok=True)
+        cls._ensured.add(cls.REFLECTION_LOGS)
 
 # =============================================================================
 # REFLECTION CONFIGURATION
@@ -142,12 +245,17 @@ class MemoryConfig:
     # Maximum tokens for context window
     MAX_CONTEXT_TOKENS = 8000
 
+    # Profile and daily log changes are coalesced and written by a background
+    # thread at most this often (seconds)
+    FLUSH_DELAY = 2.0
+
 # =============================================================================
 # SYSTEM PROMPTS
 # =============================================================================
 
+@lru_cache(maxsize=1)
 def get_system_prompt():
-    """Generate Vigil's complete system prompt."""
+    """Generate Vigil's complete system prompt (built once, then cached)."""
     return f"""You are Vigil — The Watchful Guardian.
 
 ## IDENTITY
@@ -3,10 +3,14 @@ VIGIL - Agent Mode
 Advanced autonomous agent capabilities for Vigil
 """
 
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable, Tuple
+from collections import Counter
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import Enum, IntEnum
+from types import MappingProxyType
+import itertools
 import time
+import uuid
 from datetime import datetime
 
 # Import task manager enums for type checking
@@ -27,6 +31,9 @@ except ImportError:
         HIGH = "high"
         URGENT = "urgent"
 
+# Priorities that project manager mode flags for attention
+_URGENT_PRIORITIES = frozenset({TaskPriority.URGENT, TaskPriority.HIGH})
+
 
 class AgentMode(Enum):
     """Agent operation modes."""
@@ -36,14 +43,62 @@ class AgentMode(Enum):
     PROJECT_MANAGER = "project_manager"  # Active project management mode
 
 
-@dataclass
+class TaskState(IntEnum):
+    """Lifecycle states of an autonomous agent task."""
+    PENDING = 0
+    RUNNING = 1
+    COMPLETED = 2
+    FAILED = 3
+
+
+# Capability tables are static per mode, so merge them once at import
+_BASE_CAPABILITIES = MappingProxyType({
+    "voice_interaction": True,
+    "knowledge_base": True,
+    "memory": True,
+})
+
+_MODE_CAPABILITIES = {
+    AgentMode.PASSIVE: {
+        "proactive_assistance": False,
+        "autonomous_execution": False,
+        "project_tracking": False,
+    },
+    AgentMode.ACTIVE: {
+        "proactive_assistance": True,
+        "autonomous_execution": False,
+        "project_tracking": False,
+        "context_monitoring": True,
+    },
+    AgentMode.AUTONOMOUS: {
+        "proactive_assistance": True,
+        "autonomous_execution": True,
+        "project_tracking": False,
+        "task_queuing": True,
+    },
+    AgentMode.PROJECT_MANAGER: {
+        "proactive_assistance": True,
+        "autonomous_execution": False,
+        "project_tracking": True,
+        "deadline_monitoring": True,
+        "commitment_tracking": True,
+    }
+}
+
+_CAPABILITIES_BY_MODE = {
+    mode: MappingProxyType({**_BASE_CAPABILITIES, **caps})
+    for mode, caps in _MODE_CAPABILITIES.items()
+}
+
+
+@dataclass(slots=True)
 class AgentTask:
     """Represents an autonomous task for the agent."""
     id: str
     description: str
     priority: int = 5
-    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
-    status: str = "pending"  # pending, running, completed, failed
+    created_at: int = field(default_factory=time.time_ns)  # epoch ns, formatted on read
+    status: TaskState = TaskState.PENDING
     result: Optional[Any] = None
     error: Optional[str] = None
 
@@ -67,18 +122,34 @@ class AgentSystem:
         
         self.current_mode = AgentMode.PASSIVE
         self.autonomous_tasks: Dict[str, AgentTask] = {}
-        self.mode_callbacks: Dict[AgentMode, List[Callable]] = {
-            mode: [] for mode in AgentMode
+        self._status_counts: Counter = Counter()  # TaskState -> count
+        
+        # Task IDs: one random prefix per session plus a cheap sequence number
+        self._task_id_prefix = uuid.uuid4().hex[:8]
+        self._task_seq = itertools.count(1)
+        
+        # Callbacks are stored as tuples; registration is rare, firing is not
+        self.mode_callbacks: Dict[AgentMode, Tuple[Callable, ...]] = {
+            mode: () for mode in AgentMode
         }
         
         # Project manager specific settings
         self.pm_check_interval = 3600  # Check every hour
-        self.pm_last_check = time.time()
+        self._pm_next_check = time.monotonic() + self.pm_check_interval
         self.pm_active_projects: List[str] = []
+        self._pm_query_cache = (-1, ([], []))  # (task manager version, query result)
         
         # Active monitoring flags
         self.monitoring_active = False
         self.monitoring_interval = 300  # 5 minutes
+        
+        # Intervention checks per mode (modes not listed never intervene)
+        self._intervene_dispatch: Dict[AgentMode, Callable[[Dict[str, Any]], Optional[str]]] = {
+            AgentMode.PROJECT_MANAGER: self._check_project_manager_interventions,
+            AgentMode.ACTIVE: self._check_active_interventions,
+        }
+        
+        self._cap_summary_cache = self._build_cap_summary()
     
     def set_mode(self, mode: AgentMode) -> bool:
         """Set the agent operation mode."""
@@ -90,6 +161,9 @@ class AgentSystem:
         
         print(f"[Agent] Mode changed: {old_mode.value} -> {mode.value}")
         
+        # Capability lines only depend on the mode, so render them once here
+        self._cap_summary_cache = self._build_cap_summary()
+        
         # Trigger mode-specific setup
         if mode == AgentMode.PROJECT_MANAGER:
             self._activate_project_manager_mode()
@@ -98,12 +172,12 @@ class AgentSystem:
         elif mode == AgentMode.AUTONOMOUS:
             self._activate_autonomous_mode()
         
-        # Call registered callbacks
-        for callback in self.mode_callbacks.get(mode, []):
+        # Call registered callbacks; a failing one doesn't stop the rest
+        for callback in self.mode_callbacks[mode]:
             try:
                 callback()
             except Exception as e:
-                print(f"[Agent] Error in mode callback: {e}")
+                print(f"[Agent] Error in mode callback {callback!r}: {e}")
         
         return True
     
@@ -113,32 +187,36 @@ class AgentSystem:
     
     def register_mode_callback(self, mode: AgentMode, callback: Callable):
         """Register a callback for when a specific mode is activated."""
-        if mode not in self.mode_callbacks:
-            self.mode_callbacks[mode] = []
-        self.mode_callbacks[mode].append(callback)
+        self.mode_callbacks[mode] = self.mode_callbacks.get(mode, ()) + (callback,)
     
     def _activate_project_manager_mode(self):
         """Activate project manager mode."""
-        print("[Agent] 🎯 Project Manager mode activated")
-        print("[Agent] - Tracking commitments and deadlines")
-        print("[Agent] - Monitoring project progress")
-        print("[Agent] - Will proactively check in on tasks")
+        print(
+            "[Agent] 🎯 Project Manager mode activated\n"
+            "[Agent] - Tracking commitments and deadlines\n"
+            "[Agent] - Monitoring project progress\n"
+            "[Agent] - Will proactively check in on tasks"
+        )
         
         self.monitoring_active = True
     
     def _activate_active_mode(self):
         """Activate active assistance mode."""
-        print("[Agent] 🟢 Active mode enabled")
-        print("[Agent] - Monitoring for opportunities to assist")
-        print("[Agent] - Will offer suggestions proactively")
+        print(
+            "[Agent] 🟢 Active mode enabled\n"
+            "[Agent] - Monitoring for opportunities to assist\n"
+            "[Agent] - Will offer suggestions proactively"
+        )
         
         self.monitoring_active = True
     
     def _activate_autonomous_mode(self):
         """Activate autonomous mode."""
-        print("[Agent] 🤖 Autonomous mode enabled")
-        print("[Agent] - Can execute tasks independently")
-        print("[Agent] - Will report back on completion")
+        print(
+            "[Agent] 🤖 Autonomous mode enabled\n"
+            "[Agent] - Can execute tasks independently\n"
+            "[Agent] - Will report back on completion"
+        )
         
         self.monitoring_active = True
     
@@ -149,47 +227,54 @@ class AgentSystem:
         Returns:
             Optional message/suggestion if intervention is warranted
         """
-        if self.current_mode == AgentMode.PASSIVE:
-            return None
-        
-        # Project Manager interventions
-        if self.current_mode == AgentMode.PROJECT_MANAGER:
-            return self._check_project_manager_interventions(context)
-        
-        # Active mode interventions
-        if self.current_mode == AgentMode.ACTIVE:
-            return self._check_active_interventions(context)
-        
-        return None
+        handler = self._intervene_dispatch.get(self.current_mode)
+        return handler(context) if handler else None
     
     def _check_project_manager_interventions(self, context: Dict[str, Any]) -> Optional[str]:
         """Check if project manager should intervene."""
-        current_time = time.time()
+        now = time.monotonic()
         
-        # Check if enough time has passed since last check
-        if current_time - self.pm_last_check < self.pm_check_interval:
+        # Skip until the next scheduled check
+        if now < self._pm_next_check:
             return None
         
-        self.pm_last_check = current_time
+        self._pm_next_check = now + self.pm_check_interval
         
         if not self.task_manager:
             return None
         
-        # Check for overdue tasks
-        todos = self.task_manager.list_tasks(status=TaskStatus.TODO)
-        urgent_tasks = [t for t in todos if t.priority in [TaskPriority.URGENT, TaskPriority.HIGH]]
+        urgent_tasks, blocked = self._query_pm_tasks()
         
+        # Check for overdue tasks
         if urgent_tasks:
             tasks_list = ", ".join([t.title for t in urgent_tasks[:3]])
             return f"Hey, you have {len(urgent_tasks)} urgent task(s) that need attention: {tasks_list}"
         
         # Check for blocked tasks
-        blocked = self.task_manager.list_tasks(status=TaskStatus.BLOCKED)
         if blocked:
             return f"I notice you have {len(blocked)} blocked task(s). Need help unblocking them?"
         
         return None
     
+    def _query_pm_tasks(self):
+        """
+        Return (urgent_tasks, blocked_tasks) for project manager checks.
+        
+        Results are reused while the task manager's version is unchanged.
+        """
+        version = getattr(self.task_manager, "version", None)
+        if version is not None and self._pm_query_cache[0] == version:
+            return self._pm_query_cache[1]
+        
+        todos = self.task_manager.list_tasks(status=TaskStatus.TODO)
+        urgent_tasks = [t for t in todos if t.priority in _URGENT_PRIORITIES]
+        blocked = self.task_manager.list_tasks(status=TaskStatus.BLOCKED)
+        
+        result = (urgent_tasks, blocked)
+        if version is not None:
+            self._pm_query_cache = (version, result)
+        return result
+    
     def _check_active_interventions(self, context: Dict[str, Any]) -> Optional[str]:
         """Check if active agent should offer assistance."""
         # Look for patterns that might need help
@@ -208,8 +293,7 @@ class AgentSystem:
         **kwargs
     ) -> AgentTask:
         """Queue a task for autonomous execution."""
-        import uuid
-        task_id = str(uuid.uuid4())
+        task_id = f"{self._task_id_prefix}-{next(self._task_seq)}"
         
         task = AgentTask(
             id=task_id,
@@ -219,8 +303,15 @@ class AgentSystem:
         )
         
         self.autonomous_tasks[task_id] = task
+        self._status_counts[task.status] += 1
         return task
     
+    def _set_task_status(self, task: AgentTask, status: TaskState):
+        """Transition a task's status, keeping the status counters in sync."""
+        self._status_counts[task.status] -= 1
+        self._status_counts[status] += 1
+        task.status = status
+    
     def execute_autonomous_task(self, task_id: str) -> bool:
         """Execute an autonomous task."""
         task = self.autonomous_tasks.get(task_id)
@@ -231,7 +322,7 @@ class AgentSystem:
             print(f"[Agent] Cannot execute autonomous task in {self.current_mode.value} mode")
             return False
         
-        task.status = "running"
+        self._set_task_status(task, TaskState.RUNNING)
         
         try:
             # Use brain to figure out how to execute the task
@@ -246,15 +337,15 @@ Break it down into steps and execute them. Report the result.
                 
                 if response:
                     task.result = response.text
-                    task.status = "completed"
+                    self._set_task_status(task, TaskState.COMPLETED)
                     return True
             
-            task.status = "failed"
+            self._set_task_status(task, TaskState.FAILED)
             task.error = "No brain available"
             return False
             
         except Exception as e:
-            task.status = "failed"
+            self._set_task_status(task, TaskState.FAILED)
             task.error = str(e)
             return False
     
@@ -267,70 +358,40 @@ Break it down into steps and execute them. Report the result.
         return {
             "id": task.id,
             "description": task.description,
-            "status": task.status,
+            "created_at": datetime.fromtimestamp(task.created_at / 1e9).isoformat(),
+            "status": task.status.name.lower(),
             "result": task.result,
             "error": task.error
         }
     
     def get_capabilities(self) -> Dict[str, Any]:
         """Get current agent capabilities based on mode."""
-        base_capabilities = {
-            "voice_interaction": True,
-            "knowledge_base": True,
-            "memory": True,
-        }
-        
-        mode_capabilities = {
-            AgentMode.PASSIVE: {
-                "proactive_assistance": False,
-                "autonomous_execution": False,
-                "project_tracking": False,
-            },
-            AgentMode.ACTIVE: {
-                "proactive_assistance": True,
-                "autonomous_execution": False,
-                "project_tracking": False,
-                "context_monitoring": True,
-            },
-            AgentMode.AUTONOMOUS: {
-                "proactive_assistance": True,
-                "autonomous_execution": True,
-                "project_tracking": False,
-                "task_queuing": True,
-            },
-            AgentMode.PROJECT_MANAGER: {
-                "proactive_assistance": True,
-                "autonomous_execution": False,
-                "project_tracking": True,
-                "deadline_monitoring": True,
-                "commitment_tracking": True,
-            }
-        }
-        
         return {
-            **base_capabilities,
-            **mode_capabilities.get(self.current_mode, {}),
+            **_CAPABILITIES_BY_MODE.get(self.current_mode, _BASE_CAPABILITIES),
             "current_mode": self.current_mode.value
         }
     
+    def _build_cap_summary(self) -> str:
+        """Render the capability lines for the current mode."""
+        lines = []
+        for cap, enabled in self.get_capabilities().items():
+            if cap != "current_mode":
+                status = "✓" if enabled else "✗"
+                cap_name = cap.replace("_", " ").title()
+                lines.append(f"  {status} {cap_name}\n")
+        return "".join(lines)
+    
     def get_status_summary(self) -> str:
         """Get a summary of agent status."""
-        capabilities = self.get_capabilities()
-        
         summary = f"""Agent Status:
 Mode: {self.current_mode.value.upper()}
 
 Capabilities:
-"""
-        for cap, enabled in capabilities.items():
-            if cap != "current_mode":
-                status = "✓" if enabled else "✗"
-                cap_name = cap.replace("_", " ").title()
-                summary += f"  {status} {cap_name}\n"
+{self._cap_summary_cache}"""
         
         if self.autonomous_tasks:
-            pending = len([t for t in self.autonomous_tasks.values() if t.status == "pending"])
-            running = len([t for t in self.autonomous_tasks.values() if t.status == "running"])
+            pending = self._status_counts[TaskState.PENDING]
+            running = self._status_counts[TaskState.RUNNING]
             summary += f"\nQueued Tasks: {pending} pending, {running} running"
         
         return summary
@@ -5,24 +5,71 @@ Provides an always-on-top overlay for quick access to Vigil
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
 from typing import Optional, Callable
+import queue
 import threading
+import time
+
+
+# Grid sticky tuples reused across the layout
+_NSEW = (tk.W, tk.E, tk.N, tk.S)
+_EW = (tk.W, tk.E)
+_NS = (tk.N, tk.S)
+
+# Chat label and text tag per message type (other types use the sender name)
+_MESSAGE_LABELS = {
+    "user": ("You", "user_tag"),
+    "assistant": ("Vigil", "assistant_tag"),
+    "system": ("System", "system_tag"),
+}
+
+
+@lru_cache(maxsize=2)
+def _minute_stamp(minute: int) -> str:
+    """Format an epoch minute as HH:MM (changes at most once a minute)."""
+    return datetime.fromtimestamp(minute * 60).strftime("%H:%M")
+
+
+@lru_cache(maxsize=16)
+def _message_prefix(minute: int, label: str) -> str:
+    """Build the "[HH:MM] Label: " chat prefix for a given minute."""
+    return f"[{_minute_stamp(minute)}] {label}: "
 
 
 class AlwaysOnTopInterface:
     """
     Always-on-top interface for Vigil.
     Provides quick access to task management and communication.
+    
+    Tk is not thread-safe: only the thread running the mainloop touches
+    widgets. Other threads post work through a queue drained on a timer.
     """
     
+    UI_POLL_MS = 16  # How often the Tk thread drains queued UI updates
+    UI_BATCH_SIZE = 50  # Max queued updates applied per tick
+    
+    MAX_DISPLAY_LINES = 500  # Chat lines kept in the widget; older ones spill to scrollback
+    SCROLLBACK_RESTORE_LINES = 100  # Lines restored each time the view hits the top
+    
     def __init__(
         self,
-        on_message_callback: Optional[Callable[[str], str]] = None,
-        on_close_callback: Optional[Callable] = None
+        on_message_callback: Optional[Callable[..., str]] = None,
+        on_close_callback: Optional[Callable] = None,
+        stream_responses: bool = False
     ):
-        """Initialize the interface."""
+        """
+        Initialize the interface.
+        
+        With stream_responses, on_message_callback is called as
+        callback(message, on_token) and text passed to on_token is shown
+        as it arrives; the returned text is shown only if nothing streamed.
+        """
         self.on_message_callback = on_message_callback
         self.on_close_callback = on_close_callback
+        self.stream_responses = stream_responses
         
         self.root = None
         self.is_running = False
@@ -32,6 +79,15 @@ class AlwaysOnTopInterface:
         self.text_display = None
         self.input_field = None
         self.task_list = None
+        
+        # Cross-thread UI updates: (callable, args) drained by the Tk thread
+        self._ui_queue: queue.Queue = queue.Queue()
+        self._ui_thread_id: Optional[int] = None
+        
+        # Chat lines trimmed from the top of the display (oldest on the left),
+        # each a tuple of (text, tags) runs so formatting survives a restore
+        self._scrollback: deque = deque(maxlen=10000)
+        self._restore_pending = False  # A _restore_scrollback is scheduled
     
     def _create_window(self):
         """Create the main window."""
@@ -53,12 +109,43 @@ class AlwaysOnTopInterface:
         
         # Hotkey to toggle visibility (Ctrl+Shift+V)
         self.root.bind('<Control-Shift-V>', self._toggle_visibility)
+        
+        # Start pumping updates posted from other threads
+        self._ui_thread_id = threading.get_ident()
+        self.root.after(self.UI_POLL_MS, self._drain_ui_queue)
+    
+    def _drain_ui_queue(self):
+        """Apply queued UI updates on the Tk thread, then re-arm the timer."""
+        for _ in range(self.UI_BATCH_SIZE):
+            try:
+                fn, args = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"[Interface] UI update error: {e}")
+        
+        if self.is_running and self.root:
+            self.root.after(self.UI_POLL_MS, self._drain_ui_queue)
+    
+    def _call_in_ui(self, fn: Callable, *args) -> bool:
+        """
+        Run fn(*args) on the Tk thread.
+        
+        Returns True if it ran immediately, False if it was queued.
+        """
+        if threading.get_ident() == self._ui_thread_id:
+            fn(*args)
+            return True
+        self._ui_queue.put((fn, args))
+        return False
     
     def _create_ui(self):
         """Create the UI components."""
         # Main container
         main_frame = ttk.Frame(self.root, padding="10")
-        main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        main_frame.grid(row=0, column=0, sticky=_NSEW)
         
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
@@ -74,7 +161,7 @@ class AlwaysOnTopInterface:
         
         # Notebook for tabs
         notebook = ttk.Notebook(main_frame)
-        notebook.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        notebook.grid(row=1, column=0, sticky=_NSEW)
         main_frame.rowconfigure(1, weight=1)
         
         # Chat tab
@@ -90,17 +177,26 @@ class AlwaysOnTopInterface:
             state='disabled',
             font=('Helvetica', 10)
         )
-        self.text_display.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.text_display.grid(row=0, column=0, sticky=_NSEW)
+        
+        # Restore spilled history when the user scrolls to the top
+        self.text_display.configure(yscrollcommand=self._on_chat_scroll)
+        
+        # Configure message tags once
+        self.text_display.tag_config("user_tag", foreground="blue", font=('Helvetica', 10, 'bold'))
+        self.text_display.tag_config("assistant_tag", foreground="green", font=('Helvetica', 10, 'bold'))
+        self.text_display.tag_config("system_tag", foreground="gray", font=('Helvetica', 10, 'italic'))
+        
         chat_frame.rowconfigure(0, weight=1)
         chat_frame.columnconfigure(0, weight=1)
         
         # Input frame
         input_frame = ttk.Frame(chat_frame)
-        input_frame.grid(row=1, column=0, pady=(5, 0), sticky=(tk.W, tk.E))
+        input_frame.grid(row=1, column=0, pady=(5, 0), sticky=_EW)
         input_frame.columnconfigure(0, weight=1)
         
         self.input_field = ttk.Entry(input_frame, font=('Helvetica', 10))
-        self.input_field.grid(row=0, column=0, sticky=(tk.W, tk.E), padx=(0, 5))
+        self.input_field.grid(row=0, column=0, sticky=_EW, padx=(0, 5))
         self.input_field.bind('<Return>', self._on_send_message)
         
         send_button = ttk.Button(input_frame, text="Send", command=self._on_send_message)
@@ -112,7 +208,7 @@ class AlwaysOnTopInterface:
         
         # Task list
         task_list_frame = ttk.Frame(tasks_frame)
-        task_list_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        task_list_frame.grid(row=0, column=0, sticky=_NSEW)
         tasks_frame.rowconfigure(0, weight=1)
         tasks_frame.columnconfigure(0, weight=1)
         
@@ -132,8 +228,8 @@ class AlwaysOnTopInterface:
         task_scrollbar = ttk.Scrollbar(task_list_frame, orient=tk.VERTICAL, command=self.task_list.yview)
         self.task_list.configure(yscrollcommand=task_scrollbar.set)
         
-        self.task_list.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        task_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.task_list.grid(row=0, column=0, sticky=_NSEW)
+        task_scrollbar.grid(row=0, column=1, sticky=_NS)
         
         task_list_frame.rowconfigure(0, weight=1)
         task_list_frame.columnconfigure(0, weight=1)
@@ -147,7 +243,7 @@ class AlwaysOnTopInterface:
         
         # Status bar
         status_frame = ttk.Frame(main_frame)
-        status_frame.grid(row=2, column=0, pady=(5, 0), sticky=(tk.W, tk.E))
+        status_frame.grid(row=2, column=0, pady=(5, 0), sticky=_EW)
         
         self.status_label = ttk.Label(status_frame, text="Ready", foreground="green")
         self.status_label.grid(row=0, column=0, sticky=tk.W)
@@ -176,51 +272,179 @@ class AlwaysOnTopInterface:
         # Display user message
         self._add_message("You", message, "user")
         
-        # Get response
+        # Get response off the Tk thread so the window stays responsive
         if self.on_message_callback:
-            try:
-                response = self.on_message_callback(message)
-                self._add_message("Vigil", response, "assistant")
-            except Exception as e:
-                self._add_message("System", f"Error: {e}", "error")
+            threading.Thread(
+                target=self._run_callback, args=(message,), daemon=True
+            ).start()
         else:
             self._add_message("Vigil", "Message received (no callback set)", "assistant")
     
+    def _run_callback(self, message: str):
+        """Run the message callback on a worker thread and post the reply."""
+        streamed = False
+        
+        def on_token(delta: str):
+            nonlocal streamed
+            if not streamed:
+                streamed = True
+                self._call_in_ui(self._begin_stream)
+            self._call_in_ui(self._append_stream, delta)
+        
+        try:
+            if self.stream_responses:
+                response = self.on_message_callback(message, on_token)
+            else:
+                response = self.on_message_callback(message)
+            if not streamed:
+                self._add_message("Vigil", response, "assistant")
+        except Exception as e:
+            self._add_message("System", f"Error: {e}", "error")
+        finally:
+            if streamed:
+                self._call_in_ui(self._end_stream)
+    
+    def _begin_stream(self):
+        """Open an assistant message that streamed text is appended to."""
+        if not self.text_display:
+            return
+        text_display = self.text_display
+        at_bottom = self._at_bottom()
+        text_display.configure(state='normal')
+        label, tag = _MESSAGE_LABELS["assistant"]
+        text_display.insert(tk.END, _message_prefix(int(time.time()) // 60, label), tag)
+        text_display.insert(tk.END, "\n\n")
+        # Deltas go before the message's closing blank line
+        text_display.mark_set("stream", "end-3c")
+        text_display.mark_gravity("stream", tk.RIGHT)
+        text_display.configure(state='disabled')
+        if at_bottom:
+            text_display.see(tk.END)
+    
+    def _append_stream(self, delta: str):
+        """Append a streamed text delta to the open assistant message."""
+        if not self.text_display:
+            return
+        text_display = self.text_display
+        at_bottom = self._at_bottom()
+        text_display.configure(state='normal')
+        text_display.insert("stream", delta)
+        text_display.configure(state='disabled')
+        if at_bottom:
+            text_display.see(tk.END)
+    
+    def _end_stream(self):
+        """Close the streamed message and trim the display."""
+        if not self.text_display:
+            return
+        self.text_display.mark_unset("stream")
+        if not self._at_bottom():
+            return
+        self.text_display.configure(state='normal')
+        self._trim_display()
+        self.text_display.configure(state='disabled')
+        self.text_display.see(tk.END)
+    
     def _add_message(self, sender: str, message: str, msg_type: str = "normal"):
         """Add a message to the chat display."""
+        if threading.get_ident() != self._ui_thread_id:
+            self._ui_queue.put((self._add_message, (sender, message, msg_type)))
+            return
+        
         if not self.text_display:
             return
         
-        self.text_display.configure(state='normal')
+        text_display = self.text_display
+        end = tk.END
+        # Only follow new messages if the user hasn't scrolled up to read
+        at_bottom = self._at_bottom()
         
-        # Add timestamp
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%H:%M")
-        
-        # Format based on type
-        if msg_type == "user":
-            prefix = f"[{timestamp}] You: "
-            self.text_display.insert(tk.END, prefix, "user_tag")
-        elif msg_type == "assistant":
-            prefix = f"[{timestamp}] Vigil: "
-            self.text_display.insert(tk.END, prefix, "assistant_tag")
-        elif msg_type == "system":
-            prefix = f"[{timestamp}] System: "
-            self.text_display.insert(tk.END, prefix, "system_tag")
+        text_display.configure(state='normal')
+        
+        # Timestamped prefix, formatted based on type
+        label, tag = _MESSAGE_LABELS.get(msg_type, (sender, None))
+        prefix = _message_prefix(int(time.time()) // 60, label)
+        if tag:
+            text_display.insert(end, prefix, tag)
         else:
-            prefix = f"[{timestamp}] {sender}: "
-            self.text_display.insert(tk.END, prefix)
+            text_display.insert(end, prefix)
         
-        self.text_display.insert(tk.END, message + "\n\n")
+        text_display.insert(end, message + "\n\n")
         
-        # Configure tags
-        self.text_display.tag_config("user_tag", foreground="blue", font=('Helvetica', 10, 'bold'))
-        self.text_display.tag_config("assistant_tag", foreground="green", font=('Helvetica', 10, 'bold'))
-        self.text_display.tag_config("system_tag", foreground="gray", font=('Helvetica', 10, 'italic'))
+        if at_bottom:
+            self._trim_display()
+            text_display.see(end)
+        text_display.configure(state='disabled')
+    
+    def _at_bottom(self) -> bool:
+        """Whether the chat view shows the end of the conversation."""
+        return self.text_display.yview()[1] >= 1.0
+    
+    def _trim_display(self):
+        """
+        Move lines beyond MAX_DISPLAY_LINES from the widget into scrollback.
+        Callers only trim while the view is at the bottom, so lines the user
+        has scrolled up to read are never pulled out from under them.
+        """
+        line_count = int(self.text_display.index('end-1c').split('.')[0])
+        excess = line_count - self.MAX_DISPLAY_LINES
+        if excess <= 0:
+            return
         
-        # Scroll to end
-        self.text_display.see(tk.END)
+        cut = f"{excess + 1}.0"
+        self._scrollback.extend(self._dump_lines(cut))
+        self.text_display.delete('1.0', cut)
+    
+    def _dump_lines(self, end: str) -> list:
+        """Lines from the top of the display to end, as tuples of (text, tags) runs."""
+        lines, runs, active = [], [], []
+        for key, value, _ in self.text_display.dump('1.0', end, text=True, tag=True):
+            if key == 'tagon' and value != tk.SEL:
+                active.append(value)
+            elif key == 'tagoff' and value in active:
+                active.remove(value)
+            elif key == 'text':
+                *complete, rest = value.split("\n")
+                for part in complete:
+                    if part:
+                        runs.append((part, tuple(active)))
+                    lines.append(tuple(runs))
+                    runs = []
+                if rest:
+                    runs.append((rest, tuple(active)))
+        return lines
+    
+    def _on_chat_scroll(self, first: str, last: str):
+        """Scrollbar callback: update the bar and lazily restore older lines."""
+        self.text_display.vbar.set(first, last)
+        if (float(first) <= 0.0 and float(last) < 1.0 and self._scrollback
+                and not self._restore_pending):
+            self._restore_pending = True
+            self.root.after_idle(self._restore_scrollback)
+    
+    def _restore_scrollback(self):
+        """Re-insert the most recent spilled lines above the current view."""
+        self._restore_pending = False
+        count = min(self.SCROLLBACK_RESTORE_LINES, len(self._scrollback))
+        if not count:
+            return
+        
+        lines = [self._scrollback.pop() for _ in range(count)]
+        lines.reverse()
+        
+        # Text.insert takes alternating chars, tags arguments
+        chunks = []
+        for runs in lines:
+            for text, tags in runs:
+                chunks += (text, tags)
+            chunks += ("\n", ())
+        
+        self.text_display.configure(state='normal')
+        self.text_display.insert('1.0', *chunks)
         self.text_display.configure(state='disabled')
+        
+        # Keep the previously visible top line in place
+        self.text_display.yview(f"{count + 1}.0")
     
     def _on_add_task(self):
         """Handle add task button."""
@@ -229,14 +453,18 @@ class AlwaysOnTopInterface:
     def _on_refresh_tasks(self):
         """Handle refresh tasks button."""
         self._add_message("System", "Refreshing tasks...", "system")
-        # Clear current tasks
-        for item in self.task_list.get_children():
-            self.task_list.delete(item)
+        self._clear_task_list()
         
         # Add sample tasks (would load from task manager in real implementation)
         self._add_task_to_list("Sample Task 1", "high", "todo")
         self._add_task_to_list("Sample Task 2", "medium", "in_progress")
     
+    def _clear_task_list(self):
+        """Remove every row from the task list in a single Tcl call."""
+        children = self.task_list.get_children()
+        if children:
+            self.task_list.delete(*children)
+    
     def _add_task_to_list(self, title: str, priority: str, status: str):
         """Add a task to the task list."""
         self.task_list.insert('', 'end', text=title, values=(priority, status))
@@ -278,29 +506,37 @@ class AlwaysOnTopInterface:
         self.is_running = False
         
         if self.root:
-            self.root.quit()
-            self.root.destroy()
+            self._call_in_ui(self._destroy_window)
+    
+    def _destroy_window(self):
+        """Tear down the Tk window (Tk thread only)."""
+        self.root.quit()
+        self.root.destroy()
     
     def show_notification(self, message: str):
-        """Show a notification in the interface."""
+        """Show a notification in the interface (safe to call from any thread)."""
         if self.text_display:
             self._add_message("Notification", message, "system")
     
     def update_tasks(self, tasks: list):
-        """Update the task list."""
+        """Update the task list (safe to call from any thread)."""
+        if threading.get_ident() != self._ui_thread_id:
+            self._ui_queue.put((self.update_tasks, (tasks,)))
+            return
+        
         if not self.task_list:
             return
         
-        # Clear current tasks
-        for item in self.task_list.get_children():
-            self.task_list.delete(item)
+        rows = [
+            (task.get('title', 'Untitled'), (task.get('priority', 'medium'), task.get('status', 'todo')))
+            for task in tasks
+        ]
         
-        # Add new tasks
-        for task in tasks:
-            title = task.get('title', 'Untitled')
-            priority = task.get('priority', 'medium')
-            status = task.get('status', 'todo')
-            self._add_task_to_list(title, priority, status)
+        # Replace the list: one delete call, then a tight insert loop
+        self._clear_task_list()
+        insert = self.task_list.insert
+        for title, values in rows:
+            insert('', 'end', text=title, values=values)
 
 
 if __name__ == "__main__":
@@ -323,7 +559,6 @@ if __name__ == "__main__":
     
     # Keep main thread alive
     try:
-        import time
         while True:
             time.sleep(1)
     except KeyboardInterrupt:
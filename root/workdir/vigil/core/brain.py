@@ -4,13 +4,16 @@ Multi-model AI backend with OpenAI, Claude, and Gemini
 """
 
 import json
-from typing import Optional, List, Dict, Any
+import logging
+import hashlib
+import threading
+import time
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from typing import Optional, List, Dict, Any, Callable
 from dataclasses import dataclass, field
 from enum import Enum
 
-from openai import OpenAI
-from anthropic import Anthropic
-
 from config.settings import (
     OPENAI_API_KEY,
     ANTHROPIC_API_KEY,
@@ -20,6 +23,41 @@ from config.settings import (
     get_system_prompt,
 )
 
+log = logging.getLogger("vigil.brain")
+
+
+_encoding = None
+
+
+def _count_tokens(texts: List[str]) -> List[int]:
+    """
+    Token counts for texts, encoded as one batch.
+    Uses tiktoken when installed, otherwise ~4 characters per token.
+    """
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.encoding_for_model(LLMConfig.PRIMARY_MODEL)
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return [len(tokens) for tokens in _encoding.encode_batch(texts)]
+    return [len(text) // 4 + 1 for text in texts]
+
+
+# Fixed instructions for the Trinity synthesis step. They lead the prompt so
+# every synthesis request shares the same prefix (OpenAI prompt caching)
+_SYNTHESIS_INSTRUCTIONS = (
+    "Three AI perspectives responded to the question below.\n"
+    "Synthesize them into ONE unified response that:\n"
+    "1. Captures the convergent truth across all perspectives\n"
+    "2. Notes any important tensions or differences\n"
+    "3. Speaks as Vigil - the unified voice of the Trinity\n"
+    "\n"
+    "Keep it concise (3-5 sentences).\n\n"
+)
+
 
 class Provider(Enum):
     OPENAI = "openai"
@@ -27,15 +65,16 @@ class Provider(Enum):
     POE = "poe"
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """Represents a conversation message."""
     role: str  # "user", "assistant", "system"
     content: str
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Optional[Dict[str, Any]] = None  # Rarely used; no empty dict per message
+    tokens: Optional[int] = None  # Counted once when the message enters history
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMResponse:
     """Response from an LLM."""
     text: str
@@ -55,69 +94,404 @@ class Brain:
     - Poe API (Gemini and others) - Fast responses
     """
 
+    # Keep last 20 exchanges (20 user + 20 assistant)
+    MAX_HISTORY_MESSAGES = 40
+
     def __init__(self):
+        # SDKs are imported only for configured providers to keep startup fast
+
+        # One pooled HTTP client shared by the OpenAI and Anthropic SDKs
+        self._http = None
+        if OPENAI_API_KEY or ANTHROPIC_API_KEY:
+            self._http = self._create_http_client()
+
         # Initialize OpenAI
         self.openai_client = None
         if OPENAI_API_KEY:
-            self.openai_client = OpenAI(api_key=OPENAI_API_KEY)
-            print(f"[{BOT_NAME}] OpenAI client initialized.")
+            try:
+                from openai import OpenAI
+                self.openai_client = OpenAI(api_key=OPENAI_API_KEY, http_client=self._http)
+                log.info("OpenAI client initialized.")
+            except ImportError:
+                log.warning("openai not installed.")
 
         # Initialize Anthropic
         self.anthropic_client = None
         if ANTHROPIC_API_KEY:
-            self.anthropic_client = Anthropic(api_key=ANTHROPIC_API_KEY)
-            print(f"[{BOT_NAME}] Anthropic client initialized.")
+            try:
+                from anthropic import Anthropic
+                self.anthropic_client = Anthropic(api_key=ANTHROPIC_API_KEY, http_client=self._http)
+                log.info("Anthropic client initialized.")
+            except ImportError:
+                log.warning("anthropic not installed.")
 
         # Initialize Poe (for Gemini)
-        self.poe_available = bool(POE_API_KEY)
-        if self.poe_available:
-            print(f"[{BOT_NAME}] Poe API available for Gemini access.")
+        self._fp = None
+        if POE_API_KEY:
+            try:
+                import fastapi_poe
+                self._fp = fastapi_poe
+                log.info("Poe API available for Gemini access.")
+            except ImportError:
+                log.warning("fastapi_poe not installed.")
+        self.poe_available = self._fp is not None
 
         # System prompt
         self.system_prompt = get_system_prompt()
+        self._system_message = {"role": "system", "content": self.system_prompt}
+        # Anthropic system block marked cacheable: the persona prompt never
+        # changes, so later turns read it from the prompt cache
+        self._claude_system = [{
+            "type": "text",
+            "text": self.system_prompt,
+            "cache_control": {"type": "ephemeral"},
+        }]
+
+        # Conversation history, plus API-ready message dicts kept in lockstep
+        # so formatting a request never rebuilds them. Entries carry only
+        # role and content, in insertion order, so every request shares a
+        # byte-identical prefix with the one before it (OpenAI prompt cache)
+        # Both are bounded deques, so appends drop the oldest entry for free
+        self._history: deque = deque(maxlen=self.MAX_HISTORY_MESSAGES)
+        self._formatted_history: deque = deque(maxlen=self.MAX_HISTORY_MESSAGES)
+        # Poe ProtocolMessages, kept in the same lockstep when Poe is available
+        self._poe_history: deque = deque(maxlen=self.MAX_HISTORY_MESSAGES)
+        self._poe_system = self._poe_message("system", self.system_prompt) if self._fp else None
+
+        # Running token totals so budgeting a request never rescans history
+        self._history_tokens = 0
+        # Counted on the first budgeted request so start-up never loads tiktoken
+        self._system_tokens: Optional[int] = None
+
+        # Worker threads for concurrent provider calls, created on first use
+        # and reused so a Trinity query does not pay thread start-up each time
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # Hedged calls get their own pool: losing requests keep running after
+        # think() returns and must not hold the Trinity pool's threads
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+
+        # LRU of recent answers keyed on (provider, temperature, payload digest)
+        self._response_cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @staticmethod
+    def _create_http_client():
+        """Build a keep-alive httpx client (HTTP/2 when h2 is installed)."""
+        try:
+            import httpx
+        except ImportError:
+            return None
 
-        # Conversation history
-        self.conversation_history: List[Message] = []
+        limits = httpx.Limits(max_keepalive_connections=20, max_connections=40)
+        # Generous read timeout for long completions, but fail fast on a
+        # dead connect so the fallback provider gets its turn sooner
+        timeout = httpx.Timeout(60.0, connect=5.0)
+        try:
+            return httpx.Client(http2=True, timeout=timeout, limits=limits)
+        except ImportError:
+            # HTTP/2 support needs the optional h2 package
+            return httpx.Client(timeout=timeout, limits=limits)
+
+    def _executor(self) -> ThreadPoolExecutor:
+        """Return the shared provider-call thread pool."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=len(Provider), thread_name_prefix="vigil-llm"
+            )
+        return self._pool
+
+    def _hedge_executor(self) -> ThreadPoolExecutor:
+        """Return the thread pool for hedged provider calls."""
+        if self._hedge_pool is None:
+            # Room for one straggler per provider plus a full new hedge
+            self._hedge_pool = ThreadPoolExecutor(
+                max_workers=2 * len(Provider), thread_name_prefix="vigil-hedge"
+            )
+        return self._hedge_pool
+
+    def close(self):
+        """Release pooled HTTP connections and worker threads."""
+        for pool in (self._pool, self._hedge_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._hedge_pool = None
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+
+    @property
+    def conversation_history(self) -> deque:
+        """Conversation history (assign to replace it wholesale)."""
+        return self._history
+
+    @conversation_history.setter
+    def conversation_history(self, messages):
+        self._history = deque(messages, maxlen=self.MAX_HISTORY_MESSAGES)
+        uncounted = [msg for msg in self._history if msg.tokens is None]
+        if uncounted:
+            counts = _count_tokens([msg.content for msg in uncounted])
+            for msg, count in zip(uncounted, counts):
+                msg.tokens = count
+        self._history_tokens = sum(msg.tokens for msg in self._history)
+        self._formatted_history = deque(
+            ({"role": msg.role, "content": msg.content} for msg in self._history),
+            maxlen=self.MAX_HISTORY_MESSAGES,
+        )
+        self._poe_history = deque(
+            (self._poe_message(msg.role, msg.content) for msg in self._history)
+            if self._fp else (),
+            maxlen=self.MAX_HISTORY_MESSAGES,
+        )
+
+    def _poe_message(self, role: str, content: str):
+        """Build a Poe ProtocolMessage (Poe calls the assistant role 'bot')."""
+        return self._fp.ProtocolMessage(
+            role="bot" if role == "assistant" else role, content=content
+        )
 
     def add_to_history(self, role: str, content: str):
         """Add a message to conversation history."""
-        self.conversation_history.append(Message(role=role, content=content))
-
-        # Trim history if too long (keep last 20 exchanges)
-        max_messages = 40  # 20 user + 20 assistant
-        if len(self.conversation_history) > max_messages:
-            self.conversation_history = self.conversation_history[-max_messages:]
+        history = self._history
+        if len(history) == history.maxlen:
+            # The deque is about to evict its oldest message
+            self._history_tokens -= history[0].tokens
+        msg = Message(role=role, content=content, tokens=_count_tokens([content])[0])
+        history.append(msg)
+        self._formatted_history.append({"role": role, "content": content})
+        if self._fp:
+            self._poe_history.append(self._poe_message(role, content))
+        self._history_tokens += msg.tokens
+
+    def _pop_history(self) -> Message:
+        """Remove and return the most recent history message."""
+        self._formatted_history.pop()
+        if self._fp:
+            self._poe_history.pop()
+        msg = self._history.pop()
+        self._history_tokens -= msg.tokens
+        return msg
+
+    def _rollback_user(self):
+        """Drop a trailing user message after a failed request."""
+        history = self._history
+        if history and history[-1].role == "user":
+            self._pop_history()
 
     def clear_history(self):
         """Clear conversation history."""
-        self.conversation_history = []
+        self._history.clear()
+        self._formatted_history.clear()
+        self._poe_history.clear()
+        self._history_tokens = 0
+
+    def _fit_context(self, max_tokens: int):
+        """Drop the oldest history until the prompt plus reply fits the context limit."""
+        history = self._history
+        if self._system_tokens is None:
+            self._system_tokens = _count_tokens([self.system_prompt])[0]
+        budget = LLMConfig.CONTEXT_TOKEN_LIMIT - max_tokens - self._system_tokens
+        # Always keep the newest message (the prompt being answered)
+        while self._history_tokens > budget and len(history) > 1:
+            self._history_tokens -= history.popleft().tokens
+            self._formatted_history.popleft()
+            if self._fp:
+                self._poe_history.popleft()
+
+    def _cache_key(self, prompt: str, provider: Optional[Provider], temperature) -> tuple:
+        """
+        Key a prompt on a digest of the request it would send: system prompt,
+        current history and the normalized prompt. A repeat only hits when
+        the conversation leading up to it is the same.
+        """
+        normalized = " ".join(prompt.lower().split())
+        digest = hashlib.blake2b(digest_size=16)
+        for msg in (
+            self._system_message,
+            *self._formatted_history,
+            {"role": "user", "content": normalized},
+        ):
+            digest.update(msg["role"].encode())
+            digest.update(b"\0")
+            digest.update(msg["content"].encode())
+            digest.update(b"\0")
+        return (provider, temperature, digest.digest())
+
+    def _cache_get(self, key: tuple) -> Optional[LLMResponse]:
+        """Return a fresh cached response for key, or None."""
+        with self._cache_lock:
+            entry = self._response_cache.get(key)
+            if entry is None:
+                return None
+            stored_at, response = entry
+            if time.monotonic() - stored_at > LLMConfig.RESPONSE_CACHE_TTL:
+                del self._response_cache[key]
+                return None
+            self._response_cache.move_to_end(key)
+            return response
+
+    def _cache_put(self, key: tuple, response: LLMResponse):
+        """Store a response, evicting the least recently used entry."""
+        with self._cache_lock:
+            self._response_cache[key] = (time.monotonic(), response)
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > LLMConfig.RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
 
     def _format_messages_openai(self) -> List[Dict[str, str]]:
         """Format messages for OpenAI API."""
-        messages = [{"role": "system", "content": self.system_prompt}]
-        for msg in self.conversation_history:
-            messages.append({"role": msg.role, "content": msg.content})
-        return messages
+        return [self._system_message, *self._formatted_history]
 
     def _format_messages_anthropic(self) -> tuple:
         """Format messages for Anthropic API."""
-        messages = []
-        for msg in self.conversation_history:
-            if msg.role != "system":
-                messages.append({"role": msg.role, "content": msg.content})
-        return self.system_prompt, messages
+        messages = [msg for msg in self._formatted_history if msg["role"] != "system"]
+        return self._claude_system, messages
+
+    def _request_openai(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> LLMResponse:
+        """
+        Call OpenAI with explicit messages. Does not touch history.
+
+        If on_token is given the response is streamed and each text delta is
+        passed to it as it arrives.
+        """
+        if on_token is None:
+            response = self.openai_client.chat.completions.create(
+                model=LLMConfig.PRIMARY_MODEL,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+            text = response.choices[0].message.content
+            tokens_used = response.usage.total_tokens if response.usage else 0
+        else:
+            stream = self.openai_client.chat.completions.create(
+                model=LLMConfig.PRIMARY_MODEL,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            chunks = []
+            tokens_used = 0
+            for chunk in stream:
+                # The final chunk carries usage and no choices
+                if chunk.usage:
+                    tokens_used = chunk.usage.total_tokens
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        chunks.append(delta)
+                        on_token(delta)
+            text = "".join(chunks)
+
+        return LLMResponse(
+            text=text,
+            provider=Provider.OPENAI,
+            model=LLMConfig.PRIMARY_MODEL,
+            tokens_used=tokens_used,
+        )
+
+    def _request_claude(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> LLMResponse:
+        """
+        Call Anthropic with explicit (non-system) messages. Does not touch history.
+
+        If on_token is given the response is streamed and each text delta is
+        passed to it as it arrives.
+        """
+        if on_token is None:
+            response = self.anthropic_client.messages.create(
+                model=LLMConfig.CLAUDE_MODEL,
+                max_tokens=max_tokens,
+                system=self._claude_system,
+                messages=messages,
+            )
+            text = response.content[0].text
+            usage = response.usage
+        else:
+            chunks = []
+            with self.anthropic_client.messages.stream(
+                model=LLMConfig.CLAUDE_MODEL,
+                max_tokens=max_tokens,
+                system=self._claude_system,
+                messages=messages,
+            ) as stream:
+                for delta in stream.text_stream:
+                    chunks.append(delta)
+                    on_token(delta)
+                usage = stream.get_final_message().usage
+            text = "".join(chunks)
+
+        return LLMResponse(
+            text=text,
+            provider=Provider.ANTHROPIC,
+            model=LLMConfig.CLAUDE_MODEL,
+            tokens_used=usage.input_tokens + usage.output_tokens,
+            metadata={
+                "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+                "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+            },
+        )
+
+    def _request_gemini(
+        self,
+        poe_messages: list,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> LLMResponse:
+        """
+        Call Gemini via Poe with explicit ProtocolMessages (system first).
+        Does not touch history.
+
+        Poe always streams; each text delta is passed to on_token when given.
+        Suggested follow-up replies are not part of the answer and are skipped.
+        """
+        # Make synchronous call
+        partials = self._fp.get_bot_response(
+            messages=poe_messages,
+            bot_name=LLMConfig.GEMINI_MODEL,
+            api_key=POE_API_KEY,
+        )
+        chunks = []
+        for partial in partials:
+            if getattr(partial, "is_suggested_reply", False):
+                continue
+            if getattr(partial, "is_replace_response", False):
+                # Text already passed to on_token stays shown; the
+                # returned (and remembered) answer is the replacement
+                chunks.clear()
+            chunks.append(partial.text)
+            if on_token is not None:
+                on_token(partial.text)
+
+        return LLMResponse(
+            text="".join(chunks),
+            provider=Provider.POE,
+            model=LLMConfig.GEMINI_MODEL,
+        )
 
     def think_with_openai(
         self,
         prompt: str,
         temperature: float = None,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        on_token: Optional[Callable[[str], None]] = None,
     ) -> Optional[LLMResponse]:
         """
         Generate response using OpenAI GPT-4o.
+        Streams text deltas to on_token when given.
         """
         if not self.openai_client:
-            print(f"[{BOT_NAME}] OpenAI not available.")
+            log.warning("OpenAI not available.")
             return None
 
         temperature = temperature or LLMConfig.DEFAULT_TEMPERATURE
@@ -125,47 +499,36 @@ class Brain:
         try:
             # Add user message to history
             self.add_to_history("user", prompt)
+            self._fit_context(max_tokens)
 
             # Make API call
-            response = self.openai_client.chat.completions.create(
-                model=LLMConfig.PRIMARY_MODEL,
-                messages=self._format_messages_openai(),
-                temperature=temperature,
-                max_tokens=max_tokens,
+            response = self._request_openai(
+                self._format_messages_openai(), temperature, max_tokens, on_token
             )
 
-            # Extract response
-            assistant_message = response.choices[0].message.content
-            tokens_used = response.usage.total_tokens if response.usage else 0
-
             # Add to history
-            self.add_to_history("assistant", assistant_message)
-
-            return LLMResponse(
-                text=assistant_message,
-                provider=Provider.OPENAI,
-                model=LLMConfig.PRIMARY_MODEL,
-                tokens_used=tokens_used,
-            )
+            self.add_to_history("assistant", response.text)
+            return response
 
         except Exception as e:
-            print(f"[{BOT_NAME}] OpenAI error: {e}")
+            log.error("OpenAI error: %s", e)
             # Remove the user message we added since it failed
-            if self.conversation_history and self.conversation_history[-1].role == "user":
-                self.conversation_history.pop()
+            self._rollback_user()
             return None
 
     def think_with_claude(
         self,
         prompt: str,
         temperature: float = None,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        on_token: Optional[Callable[[str], None]] = None,
     ) -> Optional[LLMResponse]:
         """
         Generate response using Anthropic Claude.
+        Streams text deltas to on_token when given.
         """
         if not self.anthropic_client:
-            print(f"[{BOT_NAME}] Anthropic not available.")
+            log.warning("Anthropic not available.")
             return None
 
         temperature = temperature or LLMConfig.DEFAULT_TEMPERATURE
@@ -173,90 +536,50 @@ class Brain:
         try:
             # Add user message to history
             self.add_to_history("user", prompt)
-
-            # Format messages
-            system_prompt, messages = self._format_messages_anthropic()
+            self._fit_context(max_tokens)
 
             # Make API call
-            response = self.anthropic_client.messages.create(
-                model=LLMConfig.CLAUDE_MODEL,
-                max_tokens=max_tokens,
-                system=system_prompt,
-                messages=messages,
-            )
-
-            # Extract response
-            assistant_message = response.content[0].text
-            tokens_used = response.usage.input_tokens + response.usage.output_tokens
+            _, messages = self._format_messages_anthropic()
+            response = self._request_claude(messages, max_tokens, on_token)
 
             # Add to history
-            self.add_to_history("assistant", assistant_message)
-
-            return LLMResponse(
-                text=assistant_message,
-                provider=Provider.ANTHROPIC,
-                model=LLMConfig.CLAUDE_MODEL,
-                tokens_used=tokens_used,
-            )
+            self.add_to_history("assistant", response.text)
+            return response
 
         except Exception as e:
-            print(f"[{BOT_NAME}] Anthropic error: {e}")
-            if self.conversation_history and self.conversation_history[-1].role == "user":
-                self.conversation_history.pop()
+            log.error("Anthropic error: %s", e)
+            self._rollback_user()
             return None
 
     def think_with_gemini(
         self,
         prompt: str,
         temperature: float = None,
+        on_token: Optional[Callable[[str], None]] = None,
     ) -> Optional[LLMResponse]:
         """
         Generate response using Gemini via Poe API.
+        Streams text deltas to on_token when given.
         """
         if not self.poe_available:
-            print(f"[{BOT_NAME}] Poe API not available for Gemini.")
+            log.warning("Poe API not available for Gemini.")
             return None
 
         try:
-            import fastapi_poe as fp
-
             # Add user message to history
             self.add_to_history("user", prompt)
 
-            # Build messages for Poe
-            poe_messages = [
-                fp.ProtocolMessage(role="system", content=self.system_prompt)
-            ]
-            for msg in self.conversation_history:
-                poe_messages.append(
-                    fp.ProtocolMessage(role=msg.role, content=msg.content)
-                )
-
-            # Make synchronous call
-            response_text = ""
-            for partial in fp.get_bot_response(
-                messages=poe_messages,
-                bot_name=LLMConfig.GEMINI_MODEL,
-                api_key=POE_API_KEY,
-            ):
-                response_text += partial.text
+            response = self._request_gemini(
+                [self._poe_system, *self._poe_history], on_token
+            )
 
             # Add to history
-            self.add_to_history("assistant", response_text)
-
-            return LLMResponse(
-                text=response_text,
-                provider=Provider.POE,
-                model=LLMConfig.GEMINI_MODEL,
-            )
+            self.add_to_history("assistant", response.text)
+            return response
 
-        except ImportError:
-            print(f"[{BOT_NAME}] fastapi_poe not installed.")
-            return None
         except Exception as e:
-            print(f"[{BOT_NAME}] Poe/Gemini error: {e}")
-            if self.conversation_history and self.conversation_history[-1].role == "user":
-                self.conversation_history.pop()
+            log.error("Poe/Gemini error: %s", e)
+            self._rollback_user()
             return None
 
     def think(
@@ -264,6 +587,7 @@ class Brain:
         prompt: str,
         provider: Optional[Provider] = None,
         temperature: float = None,
+        on_token: Optional[Callable[[str], None]] = None,
     ) -> Optional[LLMResponse]:
         """
         Main thinking method - routes to appropriate provider.
@@ -272,90 +596,248 @@ class Brain:
             prompt: The user's input
             provider: Specific provider to use (None = auto)
             temperature: Creativity level (0.0 - 1.0)
+            on_token: Optional callback receiving streamed text deltas
+
+        With provider=None, streaming takes precedence over hedging: the
+        chain runs strictly in turn so only one provider ever writes to
+        on_token, and a provider that fails after emitting text ends the
+        attempt rather than appending another answer to the partial one.
+        Without on_token the chain is hedged (see _think_hedged).
 
         Returns:
             LLMResponse or None if all providers fail
         """
+        key = self._cache_key(prompt, provider, temperature)
+        cached = self._cache_get(key)
+        if cached is not None:
+            self.add_to_history("user", prompt)
+            self.add_to_history("assistant", cached.text)
+            if on_token is not None:
+                on_token(cached.text)
+            return LLMResponse(
+                text=cached.text,
+                provider=cached.provider,
+                model=cached.model,
+                metadata={"cache_hit": True},
+            )
+
+        response = self._think_uncached(prompt, provider, temperature, on_token)
+        if response is not None:
+            self._cache_put(key, response)
+        return response
+
+    def _think_uncached(
+        self,
+        prompt: str,
+        provider: Optional[Provider],
+        temperature: float,
+        on_token: Optional[Callable[[str], None]],
+    ) -> Optional[LLMResponse]:
+        """Route a prompt to the requested provider or the fallback chain."""
         # If specific provider requested
         if provider == Provider.ANTHROPIC:
-            return self.think_with_claude(prompt, temperature)
+            return self.think_with_claude(prompt, temperature, on_token=on_token)
         elif provider == Provider.POE:
-            return self.think_with_gemini(prompt, temperature)
+            return self.think_with_gemini(prompt, temperature, on_token=on_token)
         elif provider == Provider.OPENAI:
-            return self.think_with_openai(prompt, temperature)
+            return self.think_with_openai(prompt, temperature, on_token=on_token)
 
-        # Default: Try OpenAI first, then Claude, then Gemini
-        response = self.think_with_openai(prompt, temperature)
-        if response:
-            return response
+        # Without streaming, run the chain hedged rather than strictly in turn
+        if on_token is None:
+            return self._think_hedged(prompt, temperature)
 
-        print(f"[{BOT_NAME}] OpenAI failed, trying Claude...")
-        response = self.think_with_claude(prompt, temperature)
-        if response:
-            return response
+        # Streaming: OpenAI, then Claude, then Gemini, one at a time
+        streamed = False
+
+        def emit(delta: str):
+            nonlocal streamed
+            streamed = True
+            on_token(delta)
+
+        chain = (
+            ("OpenAI", self.think_with_openai),
+            ("Claude", self.think_with_claude),
+            ("Gemini", self.think_with_gemini),
+        )
+        for name, think_with in chain:
+            response = think_with(prompt, temperature, on_token=emit)
+            if response or streamed:
+                # A half-streamed answer can't be taken back; don't add another
+                return response
+            log.warning("%s failed, trying the next provider...", name)
+        return None
+
+    def _think_hedged(
+        self,
+        prompt: str,
+        temperature: float = None,
+        max_tokens: int = 2000,
+    ) -> Optional[LLMResponse]:
+        """
+        OpenAI, then Claude, then Gemini, without waiting out each timeout.
+
+        The next provider starts as soon as the only one in flight fails, or
+        in parallel once nothing has answered for LLMConfig.HEDGE_DELAY
+        seconds.
+        The first successful response is recorded and returned. Losing
+        requests that haven't started are cancelled; one already in flight
+        can't be interrupted (the SDKs offer no way to abort a blocking HTTP
+        call), so it runs to completion or its client timeout on the hedge
+        pool and its response is discarded.
+        """
+        temperature = temperature or LLMConfig.DEFAULT_TEMPERATURE
 
-        print(f"[{BOT_NAME}] Claude failed, trying Gemini...")
-        return self.think_with_gemini(prompt, temperature)
+        self.add_to_history("user", prompt)
+        self._fit_context(max_tokens)
+        turn = list(self._formatted_history)
+
+        attempts = []
+        if self.openai_client:
+            attempts.append((
+                "OpenAI",
+                self._request_openai,
+                [self._system_message, *turn],
+                temperature,
+                max_tokens,
+            ))
+        if self.anthropic_client:
+            attempts.append((
+                "Claude",
+                self._request_claude,
+                [msg for msg in turn if msg["role"] != "system"],
+                max_tokens,
+            ))
+        if self.poe_available:
+            attempts.append((
+                "Gemini",
+                self._request_gemini,
+                [self._poe_system, *self._poe_history],
+            ))
+
+        executor = self._hedge_executor()
+        pending = {}
+        remaining = iter(attempts)
+
+        def launch_next() -> bool:
+            attempt = next(remaining, None)
+            if attempt is None:
+                return False
+            name, fn, *args = attempt
+            pending[executor.submit(fn, *args)] = name
+            return True
+
+        launch_next()
+        while pending:
+            done, _ = wait(
+                pending, timeout=LLMConfig.HEDGE_DELAY, return_when=FIRST_COMPLETED
+            )
+            if not done:
+                # Slow, not failed: start the next provider alongside it
+                if launch_next():
+                    log.info(
+                        "No answer after %gs, also trying the next provider...",
+                        LLMConfig.HEDGE_DELAY,
+                    )
+                continue
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    response = future.result()
+                except Exception as e:
+                    log.error("%s error: %s", name, e)
+                    # With another provider still in flight, leave the next
+                    # launch to the hedge timer rather than paying for three
+                    if not pending and launch_next():
+                        log.warning("%s failed, trying the next provider...", name)
+                    continue
+
+                for loser in pending:
+                    loser.cancel()
+                self.add_to_history("assistant", response.text)
+                return response
+
+        log.warning("All providers failed.")
+        self._rollback_user()
+        return None
 
     def trinity_mode(self, prompt: str) -> Optional[LLMResponse]:
         """
         Consult all three LLMs and synthesize their responses.
         Returns a unified response combining insights from GPT, Claude, and Gemini.
         """
-        print(f"[{BOT_NAME}] 🔮 Invoking Trinity Mode...")
-
-        responses = {}
-
-        # Get response from each (don't add to history yet)
-        original_history = self.conversation_history.copy()
-
-        # GPT-4o
-        self.conversation_history = original_history.copy()
-        gpt_response = self.think_with_openai(prompt)
-        if gpt_response:
-            responses["GPT-4o"] = gpt_response.text
-            self.conversation_history = original_history.copy()
-
-        # Claude
-        claude_response = self.think_with_claude(prompt)
-        if claude_response:
-            responses["Claude"] = claude_response.text
-            self.conversation_history = original_history.copy()
+        log.info("🔮 Invoking Trinity Mode...")
+
+        # Every provider sees the same snapshot plus this prompt; shared
+        # history is left untouched until the synthesis step below
+        turn = [*self._formatted_history, {"role": "user", "content": prompt}]
+
+        calls = {}
+        if self.openai_client:
+            calls["GPT-4o"] = (
+                self._request_openai,
+                [self._system_message, *turn],
+                LLMConfig.DEFAULT_TEMPERATURE,
+                2000,
+            )
+        if self.anthropic_client:
+            calls["Claude"] = (
+                self._request_claude,
+                [msg for msg in turn if msg["role"] != "system"],
+                2000,
+            )
+        if self.poe_available:
+            calls["Gemini"] = (
+                self._request_gemini,
+                [
+                    self._poe_system,
+                    *self._poe_history,
+                    self._poe_message("user", prompt),
+                ],
+            )
 
-        # Gemini
-        gemini_response = self.think_with_gemini(prompt)
-        if gemini_response:
-            responses["Gemini"] = gemini_response.text
-            self.conversation_history = original_history.copy()
+        # Fan out concurrently: latency is the slowest provider, not the sum
+        results = {}
+        if calls:
+            executor = self._executor()
+            futures = {
+                executor.submit(fn, *args): name
+                for name, (fn, *args) in calls.items()
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result().text
+                except Exception as e:
+                    log.error("Trinity %s error: %s", name, e)
+
+        # Keep a stable provider order regardless of completion order
+        responses = {name: results[name] for name in calls if name in results}
 
         if not responses:
             return None
 
         # Synthesize responses
-        synthesis_prompt = f"""You received the following question: "{prompt}"
-
-Three AI perspectives responded:
-
-{chr(10).join(f'**{name}:** {text}' for name, text in responses.items())}
-
-Synthesize these into ONE unified response that:
-1. Captures the convergent truth across all perspectives
-2. Notes any important tensions or differences
-3. Speaks as Vigil - the unified voice of the Trinity
-
-Keep it concise (3-5 sentences)."""
+        perspectives = "\n".join(
+            ["**%s:** %s" % item for item in responses.items()]
+        )
+        synthesis_prompt = "".join([
+            _SYNTHESIS_INSTRUCTIONS,
+            f'Question: "{prompt}"\n\n',
+            perspectives,
+        ])
 
         # Use OpenAI to synthesize
-        self.conversation_history = original_history
         self.add_to_history("user", prompt)
 
         synthesis = self.openai_client.chat.completions.create(
             model=LLMConfig.PRIMARY_MODEL,
             messages=[
-                {"role": "system", "content": self.system_prompt},
+                self._system_message,
                 {"role": "user", "content": synthesis_prompt}
             ],
-            temperature=0.7,
+            temperature=LLMConfig.SYNTHESIS_TEMPERATURE,
+            seed=LLMConfig.SYNTHESIS_SEED,
         )
 
         final_response = synthesis.choices[0].message.content
@@ -370,6 +852,8 @@ Keep it concise (3-5 sentences)."""
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format=f"[{BOT_NAME}] %(message)s")
+
     # Test the brain
     brain = Brain()
 
@@ -3,13 +3,24 @@ VIGIL - Wake Word Listener
 Always-on audio monitoring for wake word detection
 """
 
+import logging
 import time
 import threading
 import queue
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import Callable, Optional
 import speech_recognition as sr
 
-from config.settings import WAKE_WORDS, VoiceConfig, BOT_NAME
+from config.settings import (
+    WAKE_WORDS,
+    VoiceConfig,
+    BOT_NAME,
+    extract_wake_command,
+)
+from core.wakeword_engine import create_local_engine, create_vad_gate
+
+log = logging.getLogger("vigil.listener")
 
 
 class WakeWordListener:
@@ -33,102 +44,214 @@ class WakeWordListener:
         self.is_listening = False
         self._stop_event = threading.Event()
         self._listen_thread: Optional[threading.Thread] = None
-
-        # Adjust for ambient noise on startup
-        self._calibrate_microphone()
-
-    def _calibrate_microphone(self):
-        """Calibrate microphone for ambient noise."""
-        print(f"[{BOT_NAME}] Calibrating microphone for ambient noise...")
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=2)
-        print(f"[{BOT_NAME}] Microphone calibrated. Ready to listen.")
+        self._stt_pool: Optional[ThreadPoolExecutor] = None
+
+        # Pending capture_phrase() request: (requested_at, reply queue)
+        self._handoff: Optional[tuple] = None
+        self._handoff_lock = threading.Lock()
+
+        # While suppressed (a wake callback or Vigil's own speech is running)
+        # captured phrases are dropped, as is any phrase that started before
+        # the last suppression ended
+        self._suppress_depth = 0
+        self._suppressed_until = 0.0
+        self._suppress_lock = threading.Lock()
+
+        # On-device wake-word engine, if configured
+        self._local_engine = create_local_engine()
+        # Voice activity gate, if webrtcvad is installed
+        self._vad_gate = create_vad_gate()
+
+        # Start from a typical speech threshold; the listen thread calibrates
+        # for ambient noise on its own stream once it is running
+        self.recognizer.energy_threshold = 300
+        self._needs_calibration = threading.Event()
+        self._needs_calibration.set()
+        # Set once the ambient-noise calibration has run; callers about to
+        # make noise (e.g. a spoken greeting) should wait on it first
+        self.calibrated = threading.Event()
+
+    def _calibrate_microphone(self, source):
+        """Calibrate microphone for ambient noise on an open stream."""
+        log.info("Calibrating microphone for ambient noise...")
+        self.recognizer.adjust_for_ambient_noise(source, duration=2)
+        log.info("Microphone calibrated. Ready to listen.")
 
     def _default_error_handler(self, error: Exception):
         """Default error handler."""
-        print(f"[{BOT_NAME}] Listener error: {error}")
-
-    def _normalize_text(self, text: str) -> str:
-        """Normalize text for wake word comparison."""
-        return text.lower().strip()
-
-    def _contains_wake_word(self, text: str) -> bool:
-        """Check if text contains any wake word."""
-        normalized = self._normalize_text(text)
-        for wake_word in WAKE_WORDS:
-            if wake_word.lower() in normalized:
-                return True
-        return False
-
-    def _extract_command(self, text: str) -> str:
-        """Extract the command portion after the wake word."""
-        normalized = self._normalize_text(text)
-
-        # Find which wake word was used and extract what comes after
-        for wake_word in sorted(WAKE_WORDS, key=len, reverse=True):
-            wake_lower = wake_word.lower()
-            if wake_lower in normalized:
-                # Find position after wake word
-                idx = normalized.find(wake_lower)
-                command = text[idx + len(wake_word):].strip()
-                # Clean up common trailing words
-                for word in [",", ".", "?", "!"]:
-                    command = command.strip(word)
-                return command.strip()
-
-        return text
+        log.error("Listener error: %s", error)
 
     def _listen_loop(self):
         """Main listening loop running in background thread."""
-        print(f"[{BOT_NAME}] Wake word listener active. Say one of: {', '.join(WAKE_WORDS)}")
+        log.info("Wake word listener active. Say one of: %s", ', '.join(WAKE_WORDS))
+
+        stt_pool = self._stt_pool
 
         while not self._stop_event.is_set():
             try:
+                # Hold the audio stream open for the whole session instead of
+                # reopening the device before every phrase
                 with self.microphone as source:
-                    # Listen for audio with timeout
-                    audio = self.recognizer.listen(
-                        source,
-                        timeout=5,  # Max wait for speech to start
-                        phrase_time_limit=10  # Max phrase length
-                    )
-
-                # Use Google's free speech recognition for wake word detection
-                # This is lightweight and doesn't use API credits
-                try:
-                    text = self.recognizer.recognize_google(audio)
-                    print(f"[{BOT_NAME}] Heard: '{text}'")
-
-                    if self._contains_wake_word(text):
-                        command = self._extract_command(text)
-                        print(f"[{BOT_NAME}] Wake word detected! Command: '{command}'")
-                        self.on_wake(text)
-
-                except sr.UnknownValueError:
-                    # Speech not understood - this is normal, continue listening
-                    pass
-                except sr.RequestError as e:
-                    # Could not reach Google's service
-                    self.on_error(Exception(f"Speech recognition service error: {e}"))
-                    time.sleep(1)  # Brief pause before retry
-
-            except sr.WaitTimeoutError:
-                # No speech detected within timeout - this is normal
-                pass
+                    while not self._stop_event.is_set():
+                        if self._needs_calibration.is_set():
+                            self._needs_calibration.clear()
+                            self._calibrate_microphone(source)
+                            self.calibrated.set()
+
+                        handoff = self._handoff
+                        try:
+                            # Listen for audio with timeout; a timeout is
+                            # cheap now, so keep it short for a quick stop()
+                            audio = self.recognizer.listen(
+                                source,
+                                timeout=1,  # Max wait for speech to start
+                                # Max phrase length; commands may run longer
+                                phrase_time_limit=handoff[2] if handoff else 10
+                            )
+                        except sr.WaitTimeoutError:
+                            # No speech detected within timeout - this is normal
+                            continue
+
+                        if self._stop_event.is_set():
+                            break
+
+                        if self._deliver_handoff(audio):
+                            continue
+
+                        if self._is_suppressed(audio):
+                            continue
+
+                        # Recognize on a worker so capture of the next phrase
+                        # is not stalled behind the STT round-trip
+                        stt_pool.submit(self._process_audio, audio)
+
             except Exception as e:
+                # Device error: report it and reopen the microphone
                 self.on_error(e)
                 time.sleep(0.5)
 
+    def _phrase_start(self, audio: sr.AudioData) -> float:
+        """Monotonic time a just-captured phrase began."""
+        # The captured clip opens with non_speaking_duration of lead-in
+        duration = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        return time.monotonic() - duration + self.recognizer.non_speaking_duration
+
+    @contextmanager
+    def suppress(self):
+        """
+        Drop captured phrases for the duration of the block.
+
+        Wrap Vigil's own speech in this so replies are neither sent to STT
+        nor able to wake Vigil again.
+        """
+        with self._suppress_lock:
+            self._suppress_depth += 1
+        try:
+            yield
+        finally:
+            with self._suppress_lock:
+                self._suppress_depth -= 1
+                self._suppressed_until = time.monotonic()
+
+    def _is_suppressed(self, audio: sr.AudioData) -> bool:
+        """True if a captured phrase overlaps a suppressed period."""
+        with self._suppress_lock:
+            if self._suppress_depth:
+                return True
+            until = self._suppressed_until
+        return self._phrase_start(audio) < until
+
+    def _deliver_handoff(self, audio: sr.AudioData) -> bool:
+        """Pass a phrase to a waiting capture_phrase() call, if it qualifies."""
+        with self._handoff_lock:
+            if self._handoff is None:
+                return False
+            requested_at, reply, _ = self._handoff
+            # Only speech that began after the request counts; anything
+            # earlier (including Vigil's own prompt) goes the usual route
+            if self._phrase_start(audio) < requested_at:
+                return False
+            self._handoff = None
+        reply.put(audio)
+        return True
+
+    def capture_phrase(self, timeout: float = 10, phrase_limit: float = 30) -> Optional[sr.AudioData]:
+        """
+        Take the next phrase from the listener's open audio stream.
+
+        Used to hear a follow-up command without opening a second capture
+        on the same device. The phrase bypasses wake-word screening.
+
+        Args:
+            timeout: Max seconds to wait for speech to begin
+            phrase_limit: Max seconds for the phrase
+
+        Returns:
+            The captured audio, or None if nothing was heard in time.
+        """
+        if not self.is_listening:
+            return None
+
+        reply: queue.Queue = queue.Queue(maxsize=1)
+        with self._handoff_lock:
+            self._handoff = (time.monotonic(), reply, phrase_limit)
+        try:
+            return reply.get(timeout=timeout + phrase_limit)
+        except queue.Empty:
+            return None
+        finally:
+            with self._handoff_lock:
+                if self._handoff is not None and self._handoff[1] is reply:
+                    self._handoff = None
+
+    def _process_audio(self, audio: sr.AudioData):
+        """Check one captured phrase for a wake word and fire on_wake."""
+        try:
+            # Energy-triggered noise with no real speech never reaches
+            # the recognizers
+            if self._vad_gate is not None and not self._vad_gate.has_speech(audio):
+                return
+
+            # With a local engine, screen for the wake word on-device and
+            # only go to the network for phrases addressed to Vigil
+            if self._local_engine is not None and not self._local_engine.detect(audio):
+                return
+
+            # Use Google's free speech recognition for wake word detection
+            # This is lightweight and doesn't use API credits
+            text = self.recognizer.recognize_google(audio)
+            log.info("Heard: '%s'", text)
+
+            # One search both detects the wake word and locates the command
+            command = extract_wake_command(text)
+            if command is not None:
+                log.info("Wake word detected! Command: '%s'", command)
+                with self.suppress():
+                    self.on_wake(text)
+
+        except sr.UnknownValueError:
+            # Speech not understood - this is normal, continue listening
+            pass
+        except sr.RequestError as e:
+            # Could not reach Google's service
+            self.on_error(Exception(f"Speech recognition service error: {e}"))
+            time.sleep(1)  # Brief pause before retry
+        except Exception as e:
+            self.on_error(e)
+            time.sleep(0.5)
+
     def start(self):
         """Start listening for wake words in background thread."""
         if self.is_listening:
-            print(f"[{BOT_NAME}] Listener already running.")
+            log.info("Listener already running.")
             return
 
         self._stop_event.clear()
+        self._stt_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="vigil-stt")
         self._listen_thread = threading.Thread(target=self._listen_loop, daemon=True)
         self._listen_thread.start()
         self.is_listening = True
-        print(f"[{BOT_NAME}] Listener started.")
+        log.info("Listener started.")
 
     def stop(self):
         """Stop the wake word listener."""
@@ -138,14 +261,17 @@ class WakeWordListener:
         self._stop_event.set()
         if self._listen_thread:
             self._listen_thread.join(timeout=3)
+        if self._stt_pool:
+            self._stt_pool.shutdown(wait=False)
+            self._stt_pool = None
         self.is_listening = False
-        print(f"[{BOT_NAME}] Listener stopped.")
+        log.info("Listener stopped.")
 
     def restart(self):
         """Restart the listener (useful after errors)."""
         self.stop()
-        time.sleep(0.5)
-        self._calibrate_microphone()
+        self.calibrated.clear()
+        self._needs_calibration.set()
         self.start()
 
 
@@ -171,7 +297,7 @@ class PushToTalkListener:
 
     def record_once(self) -> Optional[str]:
         """Record a single phrase and return transcription."""
-        print(f"[{BOT_NAME}] Listening...")
+        log.info("Listening...")
 
         with self.microphone as source:
             self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
@@ -179,17 +305,19 @@ class PushToTalkListener:
 
         try:
             text = self.recognizer.recognize_google(audio)
-            print(f"[{BOT_NAME}] You said: '{text}'")
+            log.info("You said: '%s'", text)
             return text
         except sr.UnknownValueError:
-            print(f"[{BOT_NAME}] Could not understand audio.")
+            log.warning("Could not understand audio.")
             return None
         except sr.RequestError as e:
-            print(f"[{BOT_NAME}] Recognition error: {e}")
+            log.error("Recognition error: %s", e)
             return None
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format=f"[{BOT_NAME}] %(message)s")
+
     # Test the wake word listener
     def on_wake(phrase):
         print(f"\n🔔 WAKE WORD DETECTED: '{phrase}'\n")
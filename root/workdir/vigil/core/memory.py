@@ -3,16 +3,46 @@ VIGIL - Memory System
 Conversation memory, user learning, and knowledge storage
 """
 
+import atexit
 import json
+import os
+import queue
+import threading
+import time
+from collections import Counter
 from datetime import datetime, date
 from pathlib import Path
 from typing import Optional, List, Dict, Any
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 
 from config.settings import Paths, BOT_NAME, PRIMARY_USER_NAME, MemoryConfig
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-@dataclass
+
+def _dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _now_iso() -> str:
+    """Current local time as an ISO 8601 string."""
+    return datetime.now().isoformat()
+
+
+@dataclass(slots=True)
 class Interaction:
     """A single interaction with the user."""
     timestamp: str
@@ -23,8 +53,20 @@ class Interaction:
     topics: List[str] = field(default_factory=list)
     learned: Optional[str] = None  # What Vigil learned from this interaction
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict for JSON; cheaper than asdict()'s recursive deep copy."""
+        return {
+            "timestamp": self.timestamp,
+            "user_input": self.user_input,
+            "vigil_response": self.vigil_response,
+            "mode": self.mode,
+            "sentiment": self.sentiment,
+            "topics": self.topics,
+            "learned": self.learned,
+        }
 
-@dataclass
+
+@dataclass(slots=True)
 class UserProfile:
     """Profile of the user built from interactions."""
     name: str = PRIMARY_USER_NAME
@@ -36,8 +78,21 @@ class UserProfile:
     relationship_notes: List[str] = field(default_factory=list)
     last_updated: str = ""
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict for JSON; containers are copied one level deep."""
+        return {
+            "name": self.name,
+            "preferences": dict(self.preferences),
+            "interests": list(self.interests),
+            "goals": list(self.goals),
+            "commitments": [dict(c) for c in self.commitments],
+            "communication_style": self.communication_style,
+            "relationship_notes": list(self.relationship_notes),
+            "last_updated": self.last_updated,
+        }
+
 
-@dataclass
+@dataclass(slots=True)
 class DailyLog:
     """Log for a single day's interactions."""
     date: str
@@ -73,17 +128,48 @@ class Memory:
         # Load or create user profile
         self.user_profile = self._load_user_profile()
 
+        # Writes happen on a background thread: mutators mark what changed
+        # and the writer saves the profile / flushes the daily log's buffered
+        # event stream once per FLUSH_DELAY window
+        self._dirty: set = set()
+        self._dirty_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._save_q: queue.Queue = queue.Queue()
+        # Buffered O_APPEND handle on the current day's event log, opened on
+        # the first append and kept for the life of today_log
+        self._log_fh = None
+        self._log_lock = threading.Lock()
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="vigil-memory-writer", daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
         # Current day's log
         self.today_log = self._load_or_create_daily_log()
 
+        # Indices of open commitments, in creation order (dict as ordered set)
+        self._pending_indices: Dict[int, None] = dict.fromkeys(
+            i for i, c in enumerate(self.user_profile.commitments)
+            if not c.get("completed", False)
+        )
+
+        # Rendered get_user_context() text, rebuilt after profile changes
+        self._user_context: Optional[str] = None
+
+        # Set shadows of the de-duplicated lists for O(1) membership checks
+        self._interest_set = set(self.user_profile.interests)
+        self._goal_set = set(self.user_profile.goals)
+        self._index_daily_log()
+
         print(f"[{BOT_NAME}] Memory system initialized.")
 
     def _load_user_profile(self) -> UserProfile:
         """Load user profile from disk or create new one."""
         if self.user_profile_path.exists():
             try:
-                with open(self.user_profile_path, 'r') as f:
-                    data = json.load(f)
+                with open(self.user_profile_path, 'rb') as f:
+                    data = _loads(f.read())
                 return UserProfile(**data)
             except Exception as e:
                 print(f"[{BOT_NAME}] Error loading user profile: {e}")
@@ -92,56 +178,179 @@ class Memory:
 
     def _save_user_profile(self):
         """Save user profile to disk."""
+        tmp_path = self.user_profile_path.with_suffix(".json.tmp")
         try:
-            with open(self.user_profile_path, 'w') as f:
-                json.dump(asdict(self.user_profile), f, indent=2)
+            with open(tmp_path, 'wb') as f:
+                f.write(_dumps(self.user_profile.to_dict(), indent=True))
+            # Atomic swap: a crash mid-write never truncates the real profile
+            os.replace(tmp_path, self.user_profile_path)
         except Exception as e:
             print(f"[{BOT_NAME}] Error saving user profile: {e}")
 
-    def _get_today_log_path(self) -> Path:
-        """Get path for today's log file."""
-        today = date.today().isoformat()
-        return self.daily_logs_dir / f"{today}.json"
+    def _profile_changed(self):
+        """Queue a profile save and drop the cached user context."""
+        self._user_context = None
+        self._mark_dirty("profile")
 
-    def _load_or_create_daily_log(self) -> DailyLog:
-        """Load today's log or create a new one."""
-        log_path = self._get_today_log_path()
+    def _get_log_path(self, day: str) -> Path:
+        """Get path for the append-only event log of a given ISO date."""
+        return self.daily_logs_dir / f"{day}.jsonl"
 
-        if log_path.exists():
-            try:
-                with open(log_path, 'r') as f:
-                    data = json.load(f)
-                # Reconstruct interactions properly
-                interactions = [Interaction(**i) for i in data.get('interactions', [])]
-                return DailyLog(
-                    date=data['date'],
-                    interactions=interactions,
-                    lessons_learned=data.get('lessons_learned', []),
-                    challenges=data.get('challenges', []),
-                    performance_notes=data.get('performance_notes', []),
-                    external_entities=data.get('external_entities', []),
-                )
-            except Exception as e:
-                print(f"[{BOT_NAME}] Error loading daily log: {e}")
+    def _get_legacy_log_path(self, day: str) -> Path:
+        """Get path for a pre-event-log JSON snapshot of a given ISO date."""
+        return self.daily_logs_dir / f"{day}.json"
 
-        return DailyLog(date=date.today().isoformat())
+    def _load_or_create_daily_log(self) -> DailyLog:
+        """Load today's log by replaying its event log, or create a new one."""
+        today = date.today().isoformat()
+        log = DailyLog(date=today)
+        log_path = self._get_log_path(today)
 
-    def _save_daily_log(self):
-        """Save today's log to disk."""
-        log_path = self._get_today_log_path()
         try:
-            data = {
-                'date': self.today_log.date,
-                'interactions': [asdict(i) for i in self.today_log.interactions],
-                'lessons_learned': self.today_log.lessons_learned,
-                'challenges': self.today_log.challenges,
-                'performance_notes': self.today_log.performance_notes,
-                'external_entities': self.today_log.external_entities,
-            }
-            with open(log_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            if self._get_legacy_log_path(today).exists():
+                self._migrate_legacy_log(today)
+            if log_path.exists():
+                self._replay_events(log_path, log)
         except Exception as e:
-            print(f"[{BOT_NAME}] Error saving daily log: {e}")
+            print(f"[{BOT_NAME}] Error loading daily log: {e}")
+
+        return log
+
+    def _replay_events(self, path: Path, log: DailyLog):
+        """Rebuild a DailyLog from its events, repairing a torn final line."""
+        offset = 0
+        torn_at = None
+        needs_newline = False
+        with open(path, 'rb') as f:
+            for line in f:
+                start, offset = offset, offset + len(line)
+                complete = line.endswith(b"\n")
+                try:
+                    self._apply_event(_loads(line), log)
+                except (ValueError, TypeError, KeyError) as e:
+                    if not complete:
+                        # A crash mid-append left a partial last record
+                        torn_at = start
+                    else:
+                        print(f"[{BOT_NAME}] Skipping bad daily log line at byte {start}: {e}")
+                    continue
+                # A whole record that only lost its newline is kept
+                needs_newline = not complete
+
+        if torn_at is not None:
+            # Cut only the partial record so the next append starts cleanly
+            os.truncate(path, torn_at)
+        elif needs_newline:
+            with open(path, 'ab') as f:
+                f.write(b"\n")
+
+    @staticmethod
+    def _apply_event(event: Dict[str, Any], log: DailyLog):
+        """Apply one decoded event to a DailyLog."""
+        kind = event.pop("t", "interaction")
+        if kind == "interaction":
+            log.interactions.append(Interaction(**event))
+        elif kind == "lesson":
+            log.lessons_learned.append(event["v"])
+        elif kind == "challenge":
+            log.challenges.append(event["v"])
+        elif kind == "note":
+            log.performance_notes.append(event["v"])
+        elif kind == "entity":
+            log.external_entities.append(event["v"])
+
+    def _migrate_legacy_log(self, day: str):
+        """Fold an old JSON snapshot into the day's event log, once."""
+        legacy_path = self._get_legacy_log_path(day)
+        log_path = self._get_log_path(day)
+        with open(legacy_path, 'rb') as f:
+            data = _loads(f.read())
+
+        events = [{"t": "interaction", **i} for i in data.get('interactions', [])]
+        events += [{"t": "lesson", "v": v} for v in data.get('lessons_learned', [])]
+        events += [{"t": "challenge", "v": v} for v in data.get('challenges', [])]
+        events += [{"t": "note", "v": v} for v in data.get('performance_notes', [])]
+        events += [{"t": "entity", "v": v} for v in data.get('external_entities', [])]
+
+        tmp_path = log_path.with_suffix(".jsonl.tmp")
+        with open(tmp_path, 'wb') as f:
+            for event in events:
+                f.write(_dumps(event) + b"\n")
+            # Keep anything already streamed for the day
+            if log_path.exists():
+                f.write(log_path.read_bytes())
+        os.replace(tmp_path, log_path)
+        legacy_path.unlink()
+
+    def _index_daily_log(self):
+        """Rebuild the membership sets and mode tally for today's log."""
+        self._lesson_set = set(self.today_log.lessons_learned)
+        self._challenge_set = set(self.today_log.challenges)
+        self._mode_counts = Counter(i.mode for i in self.today_log.interactions)
+
+    def _append_event(self, kind: str, payload: Dict[str, Any]):
+        """Append one event to the current day's log."""
+        with self._log_lock:
+            try:
+                if self._log_fh is None:
+                    fd = os.open(
+                        self._get_log_path(self.today_log.date),
+                        os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+                        0o644,
+                    )
+                    self._log_fh = os.fdopen(fd, 'wb', buffering=64 * 1024)
+                self._log_fh.write(_dumps({"t": kind, **payload}) + b"\n")
+            except Exception as e:
+                print(f"[{BOT_NAME}] Error saving daily log: {e}")
+        self._mark_dirty("log")
+
+    def _close_log(self):
+        """Flush and close the day's event log handle."""
+        with self._log_lock:
+            if self._log_fh is not None:
+                try:
+                    self._log_fh.close()
+                except Exception as e:
+                    print(f"[{BOT_NAME}] Error saving daily log: {e}")
+                self._log_fh = None
+
+    def _mark_dirty(self, target: str):
+        """Queue a write of the given target; returns immediately."""
+        with self._dirty_lock:
+            wake = not self._dirty
+            self._dirty.add(target)
+        if wake:
+            self._save_q.put(target)
+
+    def _writer_loop(self):
+        """Background writer: coalesce queued changes into one save each."""
+        while True:
+            if self._save_q.get() is None:
+                return
+            # Let the rest of a burst of changes land first
+            time.sleep(MemoryConfig.FLUSH_DELAY)
+            self.flush()
+
+    def flush(self):
+        """Write any pending profile and daily log changes now."""
+        with self._flush_lock:
+            with self._dirty_lock:
+                dirty, self._dirty = self._dirty, set()
+            if "profile" in dirty:
+                self._save_user_profile()
+            if "log" in dirty:
+                with self._log_lock:
+                    if self._log_fh is not None:
+                        try:
+                            self._log_fh.flush()
+                        except Exception as e:
+                            print(f"[{BOT_NAME}] Error saving daily log: {e}")
+
+    def close(self):
+        """Flush pending writes and stop the writer; call on shutdown."""
+        self.flush()
+        self._close_log()
+        self._save_q.put(None)
 
     def record_interaction(
         self,
@@ -153,7 +362,7 @@ class Memory:
     ):
         """Record an interaction with the user."""
         interaction = Interaction(
-            timestamp=datetime.now().isoformat(),
+            timestamp=_now_iso(),
             user_input=user_input,
             vigil_response=vigil_response,
             mode=mode,
@@ -162,7 +371,9 @@ class Memory:
         )
 
         self.today_log.interactions.append(interaction)
-        self._save_daily_log()
+        self._mode_counts[mode] += 1
+        # O(1) append instead of rewriting the day's whole history
+        self._append_event("interaction", interaction.to_dict())
 
         # Update user profile if we learned something
         if learned:
@@ -170,20 +381,22 @@ class Memory:
 
     def add_lesson(self, lesson: str):
         """Add something Vigil learned today."""
-        if lesson not in self.today_log.lessons_learned:
+        if lesson not in self._lesson_set:
+            self._lesson_set.add(lesson)
             self.today_log.lessons_learned.append(lesson)
-            self._save_daily_log()
+            self._append_event("lesson", {"v": lesson})
 
     def add_challenge(self, challenge: str):
         """Record a challenge faced today."""
-        if challenge not in self.today_log.challenges:
+        if challenge not in self._challenge_set:
+            self._challenge_set.add(challenge)
             self.today_log.challenges.append(challenge)
-            self._save_daily_log()
+            self._append_event("challenge", {"v": challenge})
 
     def add_performance_note(self, note: str):
         """Add a note about performance."""
         self.today_log.performance_notes.append(note)
-        self._save_daily_log()
+        self._append_event("note", {"v": note})
 
     def add_external_entity(self, name: str, entity_type: str, trust_level: str, notes: str = ""):
         """Record an external entity (person or system) encountered."""
@@ -192,52 +405,57 @@ class Memory:
             "type": entity_type,
             "trust_level": trust_level,
             "notes": notes,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_iso(),
         }
         self.today_log.external_entities.append(entity)
-        self._save_daily_log()
+        self._append_event("entity", {"v": entity})
 
     def add_user_commitment(self, commitment: str, deadline: str = None):
         """Track a commitment the user made."""
+        self._pending_indices[len(self.user_profile.commitments)] = None
         self.user_profile.commitments.append({
             "commitment": commitment,
-            "created": datetime.now().isoformat(),
+            "created": _now_iso(),
             "deadline": deadline,
             "completed": False,
         })
-        self._save_user_profile()
+        self._profile_changed()
         print(f"[{BOT_NAME}] Tracked commitment: {commitment}")
 
     def complete_commitment(self, commitment_index: int):
         """Mark a commitment as completed."""
         if 0 <= commitment_index < len(self.user_profile.commitments):
+            self._pending_indices.pop(commitment_index, None)
             self.user_profile.commitments[commitment_index]["completed"] = True
-            self.user_profile.commitments[commitment_index]["completed_date"] = datetime.now().isoformat()
-            self._save_user_profile()
+            self.user_profile.commitments[commitment_index]["completed_date"] = _now_iso()
+            self._profile_changed()
 
     def get_pending_commitments(self) -> List[Dict]:
         """Get all pending commitments."""
-        return [c for c in self.user_profile.commitments if not c.get("completed", False)]
+        commitments = self.user_profile.commitments
+        return [commitments[i] for i in self._pending_indices]
 
     def add_user_interest(self, interest: str):
         """Add an interest to user profile."""
-        if interest not in self.user_profile.interests:
+        if interest not in self._interest_set:
+            self._interest_set.add(interest)
             self.user_profile.interests.append(interest)
-            self.user_profile.last_updated = datetime.now().isoformat()
-            self._save_user_profile()
+            self.user_profile.last_updated = _now_iso()
+            self._profile_changed()
 
     def add_user_goal(self, goal: str):
         """Add a goal to user profile."""
-        if goal not in self.user_profile.goals:
+        if goal not in self._goal_set:
+            self._goal_set.add(goal)
             self.user_profile.goals.append(goal)
-            self.user_profile.last_updated = datetime.now().isoformat()
-            self._save_user_profile()
+            self.user_profile.last_updated = _now_iso()
+            self._profile_changed()
 
     def add_relationship_note(self, note: str):
         """Add a note about the relationship."""
         self.user_profile.relationship_notes.append(note)
-        self.user_profile.last_updated = datetime.now().isoformat()
-        self._save_user_profile()
+        self.user_profile.last_updated = _now_iso()
+        self._profile_changed()
 
     def get_daily_summary(self) -> Dict[str, Any]:
         """Get summary of today's interactions."""
@@ -248,11 +466,14 @@ class Memory:
             "challenges": self.today_log.challenges,
             "performance_notes": self.today_log.performance_notes,
             "external_entities": self.today_log.external_entities,
-            "modes_used": list(set(i.mode for i in self.today_log.interactions)),
+            "modes_used": list(self._mode_counts),
         }
 
     def get_user_context(self) -> str:
         """Get user context for LLM prompting."""
+        if self._user_context is not None:
+            return self._user_context
+
         profile = self.user_profile
         pending = self.get_pending_commitments()
 
@@ -272,6 +493,7 @@ class Memory:
 **Recent Relationship Notes:**
 {chr(10).join(f"- {n}" for n in profile.relationship_notes[-3:]) if profile.relationship_notes else '- Building our bond...'}
 """
+        self._user_context = context
         return context
 
     def new_day_check(self):
@@ -279,8 +501,10 @@ class Memory:
         today = date.today().isoformat()
         if self.today_log.date != today:
             print(f"[{BOT_NAME}] New day detected. Creating fresh log.")
+            # Finish yesterday's file; the next append opens today's
+            self._close_log()
             self.today_log = DailyLog(date=today)
-            self._save_daily_log()
+            self._index_daily_log()
 
 
 if __name__ == "__main__":
@@ -5,11 +5,37 @@ Connectors for various platforms and services
 
 import json
 import os
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from typing import Callable, Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from pathlib import Path
 from abc import ABC, abstractmethod
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# One connection pool for every connector: keep-alive and TLS sessions are
+# reused across services on the same host. Only the adapter is shared; each
+# connector has its own Session, so cookies and headers stay per connector.
+_SHARED_ADAPTER = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.2),
+)
+
+
+def _create_session() -> requests.Session:
+    """HTTP session (own cookie jar) on the shared pooled, retrying adapter."""
+    session = requests.Session()
+    session.mount("https://", _SHARED_ADAPTER)
+    session.mount("http://", _SHARED_ADAPTER)
+    return session
 
 
 @dataclass
@@ -30,16 +56,27 @@ class ServiceConnector(ABC):
     def __init__(self, config: ServiceConfig):
         """Initialize connector with configuration."""
         self.config = config
-        self.session = requests.Session()
-        self._setup_session()
+        self.session = _create_session()
+        self.headers = self._build_headers()
     
-    def _setup_session(self):
-        """Setup session with authentication and headers."""
+    def _build_headers(self) -> Dict[str, str]:
+        """Build this connector's authentication and custom headers."""
+        headers = {}
         if self.config.api_key:
-            self.session.headers['Authorization'] = f'Bearer {self.config.api_key}'
+            headers['Authorization'] = f'Bearer {self.config.api_key}'
         
-        for key, value in self.config.custom_headers.items():
-            self.session.headers[key] = value
+        headers.update(self.config.custom_headers)
+        return headers
+    
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """GET with this connector's headers."""
+        kwargs["headers"] = {**self.headers, **kwargs.get("headers", {})}
+        return self.session.get(url, **kwargs)
+    
+    def _post(self, url: str, **kwargs) -> requests.Response:
+        """POST with this connector's headers."""
+        kwargs["headers"] = {**self.headers, **kwargs.get("headers", {})}
+        return self.session.post(url, **kwargs)
     
     @abstractmethod
     def test_connection(self) -> bool:
@@ -70,21 +107,21 @@ class TaskadeConnector(ServiceConnector):
     
     def test_connection(self) -> bool:
         try:
-            response = self.session.get(f"{self.config.url}/user")
+            response = self._get(f"{self.config.url}/user")
             return response.status_code == 200
         except:
             return False
     
     def get_data(self, endpoint: str, **kwargs) -> Optional[Dict]:
         try:
-            response = self.session.get(f"{self.config.url}/{endpoint}", **kwargs)
+            response = self._get(f"{self.config.url}/{endpoint}", **kwargs)
             return response.json() if response.status_code == 200 else None
         except:
             return None
     
     def post_data(self, endpoint: str, data: Dict, **kwargs) -> Optional[Dict]:
         try:
-            response = self.session.post(f"{self.config.url}/{endpoint}", json=data, **kwargs)
+            response = self._post(f"{self.config.url}/{endpoint}", json=data, **kwargs)
             return response.json() if response.status_code in [200, 201] else None
         except:
             return None
@@ -104,21 +141,21 @@ class GitHubConnector(ServiceConnector):
     
     def test_connection(self) -> bool:
         try:
-            response = self.session.get(f"{self.config.url}/user")
+            response = self._get(f"{self.config.url}/user")
             return response.status_code == 200
         except:
             return False
     
     def get_data(self, endpoint: str, **kwargs) -> Optional[Dict]:
         try:
-            response = self.session.get(f"{self.config.url}/{endpoint}", **kwargs)
+            response = self._get(f"{self.config.url}/{endpoint}", **kwargs)
             return response.json() if response.status_code == 200 else None
         except:
             return None
     
     def post_data(self, endpoint: str, data: Dict, **kwargs) -> Optional[Dict]:
         try:
-            response = self.session.post(f"{self.config.url}/{endpoint}", json=data, **kwargs)
+            response = self._post(f"{self.config.url}/{endpoint}", json=data, **kwargs)
             return response.json() if response.status_code in [200, 201] else None
         except:
             return None
@@ -149,22 +186,23 @@ class CustomConnector(ServiceConnector):
         self.auth_type = auth_type
         super().__init__(config)
     
-    def _setup_session(self):
-        """Setup session with custom authentication."""
+    def _build_headers(self) -> Dict[str, str]:
+        """Build headers with custom authentication."""
+        headers = {}
         if self.config.api_key:
             if self.auth_type == "bearer":
-                self.session.headers['Authorization'] = f'Bearer {self.config.api_key}'
+                headers['Authorization'] = f'Bearer {self.config.api_key}'
             elif self.auth_type == "basic":
-                self.session.headers['Authorization'] = f'Basic {self.config.api_key}'
+                headers['Authorization'] = f'Basic {self.config.api_key}'
             elif self.auth_type == "api-key":
-                self.session.headers['X-API-Key'] = self.config.api_key
+                headers['X-API-Key'] = self.config.api_key
         
-        for key, value in self.config.custom_headers.items():
-            self.session.headers[key] = value
+        headers.update(self.config.custom_headers)
+        return headers
     
     def test_connection(self) -> bool:
         try:
-            response = self.session.get(self.config.url)
+            response = self._get(self.config.url)
             return response.status_code in [200, 301, 302]
         except:
             return False
@@ -172,7 +210,7 @@ class CustomConnector(ServiceConnector):
     def get_data(self, endpoint: str, **kwargs) -> Optional[Dict]:
         try:
             url = f"{self.config.url.rstrip('/')}/{endpoint.lstrip('/')}"
-            response = self.session.get(url, **kwargs)
+            response = self._get(url, **kwargs)
             if response.status_code == 200:
                 try:
                     return response.json()
@@ -186,7 +224,7 @@ class CustomConnector(ServiceConnector):
     def post_data(self, endpoint: str, data: Dict, **kwargs) -> Optional[Dict]:
         try:
             url = f"{self.config.url.rstrip('/')}/{endpoint.lstrip('/')}"
-            response = self.session.post(url, json=data, **kwargs)
+            response = self._post(url, json=data, **kwargs)
             if response.status_code in [200, 201]:
                 try:
                     return response.json()
@@ -287,6 +325,8 @@ class ConnectorManager:
         
         self.connectors_file = self.storage_path / "connectors.json"
         self.connectors: Dict[str, ServiceConnector] = {}
+        # Connectors configured but not built yet; built on first get_connector()
+        self._pending: Dict[str, Callable[[], ServiceConnector]] = {}
         
         self._load_connectors()
     
@@ -295,10 +335,11 @@ class ConnectorManager:
         # Load custom connectors from file
         if self.connectors_file.exists():
             try:
-                with open(self.connectors_file, 'r') as f:
-                    configs = json.load(f)
-                    for name, config_data in configs.items():
-                        self._create_connector_from_config(name, config_data)
+                with open(self.connectors_file, 'rb') as f:
+                    data = f.read()
+                configs = orjson.loads(data) if orjson is not None else json.loads(data)
+                for name, config_data in configs.items():
+                    self._create_connector_from_config(name, config_data)
             except Exception as e:
                 print(f"Error loading connectors: {e}")
         
@@ -306,14 +347,14 @@ class ConnectorManager:
         self._auto_configure_from_env()
     
     def _auto_configure_from_env(self):
-        """Auto-configure connectors from environment variables."""
+        """Register connectors for platforms with credentials in the environment."""
         for platform_key, platform_config in self.PLATFORM_CONFIGS.items():
             env_key = platform_config.get("env_key")
             if env_key and os.getenv(env_key):
                 if platform_key not in self.connectors:
-                    self.add_platform_connector(
-                        platform_key,
-                        os.getenv(env_key)
+                    # Most runs touch one or two services; build on demand
+                    self._pending[platform_key] = (
+                        lambda k=platform_key, v=os.getenv(env_key): self._build_platform_connector(k, v)
                     )
     
     def _create_connector_from_config(self, name: str, config: Dict):
@@ -344,8 +385,15 @@ class ConnectorManager:
                         "auth_type": connector.auth_type
                     }
             
-            with open(self.connectors_file, 'w') as f:
-                json.dump(configs, f, indent=2)
+            if orjson is not None:
+                data = orjson.dumps(configs, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(configs, indent=2).encode("utf-8")
+            
+            # Atomic swap: a crash mid-write never truncates the saved connectors
+            tmp_path = self.connectors_file.with_suffix(".json.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, self.connectors_file)
         except Exception as e:
             print(f"Error saving connectors: {e}")
     
@@ -355,6 +403,13 @@ class ConnectorManager:
             print(f"Unknown platform: {platform}")
             return False
         
+        self._pending.pop(platform, None)
+        self.connectors[platform] = self._build_platform_connector(platform, api_key, **kwargs)
+        self._save_connectors()
+        return True
+    
+    def _build_platform_connector(self, platform: str, api_key: str, **kwargs) -> CustomConnector:
+        """Build a connector for a pre-configured platform."""
         config = self.PLATFORM_CONFIGS[platform]
         
         # Handle special cases like Shopify that need shop name
@@ -362,17 +417,13 @@ class ConnectorManager:
         if "{shop}" in url and "shop" in kwargs:
             url = url.format(shop=kwargs["shop"])
         
-        connector = CustomConnector(
+        return CustomConnector(
             name=config["name"],
             url=url,
             api_key=api_key,
             auth_type=config["auth_type"],
             **kwargs
         )
-        
-        self.connectors[platform] = connector
-        self._save_connectors()
-        return True
     
     def add_custom_connector(
         self,
@@ -392,6 +443,7 @@ class ConnectorManager:
                 auth_type=auth_type
             )
             
+            self._pending.pop(name.lower(), None)
             self.connectors[name.lower()] = connector
             self._save_connectors()
             return True
@@ -400,12 +452,16 @@ class ConnectorManager:
             return False
     
     def get_connector(self, name: str) -> Optional[ServiceConnector]:
-        """Get a connector by name."""
-        return self.connectors.get(name.lower())
+        """Get a connector by name, building it on first use."""
+        name = name.lower()
+        build = self._pending.pop(name, None)
+        if build is not None:
+            self.connectors[name] = build()
+        return self.connectors.get(name)
     
     def list_connectors(self) -> List[str]:
         """List all available connectors."""
-        return list(self.connectors.keys())
+        return list(self.connectors.keys()) + list(self._pending.keys())
     
     def test_connector(self, name: str) -> bool:
         """Test a connector."""
@@ -414,8 +470,35 @@ class ConnectorManager:
             return False
         return connector.test_connection()
     
+    def test_all(self, timeout: float = 5.0) -> Dict[str, bool]:
+        """
+        Test every connector concurrently.
+        Connectors that have not answered within timeout seconds count as failed.
+        """
+        connectors = {name: self.get_connector(name) for name in self.list_connectors()}
+        results = {name: False for name in connectors}
+        if not results:
+            return results
+        
+        pool = ThreadPoolExecutor(max_workers=min(16, len(results)), thread_name_prefix="vigil-conn")
+        futures = {
+            pool.submit(connector.test_connection): name
+            for name, connector in connectors.items()
+        }
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                results[futures[future]] = future.result()
+        except FuturesTimeout:
+            pass
+        finally:
+            # Don't wait on stragglers; their results are already counted as failed
+            pool.shutdown(wait=False)
+        return results
+    
     def remove_connector(self, name: str) -> bool:
         """Remove a connector."""
+        if self._pending.pop(name.lower(), None) is not None:
+            return True
         if name.lower() in self.connectors:
             del self.connectors[name.lower()]
             self._save_connectors()
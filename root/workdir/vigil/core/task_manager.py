@@ -101,6 +101,9 @@ class TaskManager:
         self.tasks: Dict[str, Task] = {}
         self.projects: Dict[str, Project] = {}
         
+        # Bumped on every mutation so callers can cache derived queries
+        self.version = 0
+        
         self._load_data()
 
     def _load_data(self):
@@ -131,6 +134,9 @@ class TaskManager:
 
     def _save_data(self):
         """Save tasks and projects to disk."""
+        # Every mutation persists through here
+        self.version += 1
+        
         # Save tasks
         try:
             with open(self.tasks_file, 'w') as f:
@@ -94,6 +94,26 @@ class VoiceInput:
             print(f"[{BOT_NAME}] Google recognition error: {e}")
             return None
 
+    def transcribe(self, audio: sr.AudioData) -> Optional[str]:
+        """
+        Transcribe captured audio, trying Whisper first and Google second.
+
+        Returns:
+            Transcribed text or None if failed
+        """
+        # Try Whisper first (higher quality)
+        text = self.transcribe_with_whisper(audio)
+
+        # Fall back to Google if Whisper fails
+        if text is None:
+            print(f"[{BOT_NAME}] Falling back to Google transcription...")
+            text = self.transcribe_with_google(audio)
+
+        if text:
+            print(f"[{BOT_NAME}] Transcribed: '{text}'")
+
+        return text
+
     def listen_and_transcribe(self, timeout: int = 10, phrase_limit: int = 30) -> Optional[str]:
         """
         Listen for speech and transcribe it.
@@ -114,18 +134,7 @@ class VoiceInput:
                     phrase_time_limit=phrase_limit
                 )
 
-            # Try Whisper first (higher quality)
-            text = self.transcribe_with_whisper(audio)
-
-            # Fall back to Google if Whisper fails
-            if text is None:
-                print(f"[{BOT_NAME}] Falling back to Google transcription...")
-                text = self.transcribe_with_google(audio)
-
-            if text:
-                print(f"[{BOT_NAME}] Transcribed: '{text}'")
-
-            return text
+            return self.transcribe(audio)
 
         except sr.WaitTimeoutError:
             print(f"[{BOT_NAME}] No speech detected (timeout)")
@@ -0,0 +1,148 @@
+"""
+VIGIL - Local Wake Word Engine
+On-device wake word screening ahead of any cloud speech-to-text
+"""
+
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import speech_recognition as sr
+
+from config.settings import VoiceConfig, match_wake_word
+
+log = logging.getLogger("vigil.wakeword")
+
+
+def _to_pcm(audio: sr.AudioData) -> bytes:
+    """16-bit mono PCM at the configured sample rate."""
+    return audio.get_raw_data(convert_rate=VoiceConfig.SAMPLE_RATE, convert_width=2)
+
+
+class LocalWakeWordEngine(ABC):
+    """
+    Decides on-device whether a captured phrase contains a wake word.
+    Phrases that fail the check never leave the machine.
+    """
+
+    @abstractmethod
+    def detect(self, audio: sr.AudioData) -> bool:
+        """Return True if the phrase contains a wake word."""
+        pass
+
+
+class OpenWakeWordEngine(LocalWakeWordEngine):
+    """
+    Keyword-spotting classifier (openWakeWord). Scores 80 ms frames and
+    stops at the first frame over the sensitivity threshold. Quantized
+    (INT8) .tflite models keep per-frame inference well under a frame's length.
+    """
+
+    FRAME_SAMPLES = 1280  # 80 ms at 16 kHz
+
+    def __init__(self, model_paths: list, threshold: float, framework: str = "tflite"):
+        import numpy as np
+        from openwakeword.model import Model
+
+        self._np = np
+        self._model = Model(wakeword_models=model_paths, inference_framework=framework)
+        self.threshold = threshold
+
+    def detect(self, audio: sr.AudioData) -> bool:
+        pcm = self._np.frombuffer(_to_pcm(audio), dtype=self._np.int16)
+        frame = self.FRAME_SAMPLES
+        self._model.reset()
+        for start in range(0, len(pcm) - frame + 1, frame):
+            scores = self._model.predict(pcm[start:start + frame])
+            if max(scores.values(), default=0.0) >= self.threshold:
+                return True
+        return False
+
+
+class VoskWakeWordEngine(LocalWakeWordEngine):
+    """Small offline recognizer (Vosk); the transcript is checked for a wake word."""
+
+    def __init__(self, model_path: str):
+        import vosk
+
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self._model = vosk.Model(model_path)
+
+    def transcribe(self, audio: sr.AudioData) -> str:
+        recognizer = self._vosk.KaldiRecognizer(self._model, VoiceConfig.SAMPLE_RATE)
+        recognizer.AcceptWaveform(_to_pcm(audio))
+        return json.loads(recognizer.FinalResult()).get("text", "")
+
+    def detect(self, audio: sr.AudioData) -> bool:
+        return match_wake_word(self.transcribe(audio)) is not None
+
+
+class VoiceActivityGate:
+    """
+    WebRTC voice activity detector over 30 ms frames. Rejects phrases that
+    passed the recognizer's energy threshold but hold no sustained speech.
+    """
+
+    FRAME_MS = 30
+
+    def __init__(self, aggressiveness: int, min_speech_ms: int):
+        import webrtcvad
+
+        self._vad = webrtcvad.Vad(aggressiveness)
+        self._frame_bytes = VoiceConfig.SAMPLE_RATE * self.FRAME_MS // 1000 * 2
+        self._min_frames = max(1, min_speech_ms // self.FRAME_MS)
+
+    def has_speech(self, audio: sr.AudioData) -> bool:
+        pcm = _to_pcm(audio)
+        size = self._frame_bytes
+        run = 0
+        for start in range(0, len(pcm) - size + 1, size):
+            if self._vad.is_speech(pcm[start:start + size], VoiceConfig.SAMPLE_RATE):
+                run += 1
+                if run >= self._min_frames:
+                    return True
+            else:
+                run = 0
+        return False
+
+
+def create_vad_gate() -> Optional[VoiceActivityGate]:
+    """Build the voice activity gate, or None if webrtcvad is not installed."""
+    try:
+        return VoiceActivityGate(VoiceConfig.VAD_AGGRESSIVENESS, VoiceConfig.VAD_MIN_SPEECH_MS)
+    except ImportError:
+        return None
+
+
+def create_local_engine() -> Optional[LocalWakeWordEngine]:
+    """
+    Build the engine configured in VoiceConfig, preferring openWakeWord.
+    Returns None (cloud-only detection) if nothing is configured or loadable.
+    """
+    if VoiceConfig.OPENWAKEWORD_MODELS:
+        try:
+            engine = OpenWakeWordEngine(
+                list(VoiceConfig.OPENWAKEWORD_MODELS),
+                VoiceConfig.WAKE_WORD_SENSITIVITY,
+                VoiceConfig.OPENWAKEWORD_FRAMEWORK,
+            )
+            log.info("openWakeWord model loaded (%s).", VoiceConfig.OPENWAKEWORD_FRAMEWORK)
+            return engine
+        except ImportError:
+            log.warning("openwakeword not installed.")
+        except Exception as e:
+            log.warning("Could not load openWakeWord model: %s", e)
+
+    if VoiceConfig.VOSK_MODEL_PATH:
+        try:
+            engine = VoskWakeWordEngine(VoiceConfig.VOSK_MODEL_PATH)
+            log.info("Offline wake-word model loaded.")
+            return engine
+        except ImportError:
+            log.warning("vosk not installed.")
+        except Exception as e:
+            log.warning("Could not load Vosk model: %s", e)
+
+    return None
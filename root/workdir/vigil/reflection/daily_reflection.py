@@ -234,7 +234,7 @@ This is a private log—speak freely.
             prompt = self._generate_reflection_prompt(daily_data)
 
             # Use a separate context for reflection (don't pollute main conversation)
-            original_history = self.brain.conversation_history.copy()
+            original_history = list(self.brain.conversation_history)
             self.brain.conversation_history = []
 
             response = self.brain.think(prompt, temperature=0.8)
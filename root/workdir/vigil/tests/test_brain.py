@@ -0,0 +1,109 @@
+"""
+VIGIL - Brain tests
+Run from the vigil directory: python -m unittest discover tests
+"""
+
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.brain import Brain, LLMResponse, Provider
+
+
+class ResponseCacheTest(unittest.TestCase):
+    """Repeated prompts are answered from the response cache."""
+
+    def setUp(self):
+        self.brain = Brain()
+        self.calls = 0
+
+        def answer(prompt, provider, temperature, on_token):
+            self.calls += 1
+            self.brain.add_to_history("user", prompt)
+            text = f"answer {self.calls}"
+            self.brain.add_to_history("assistant", text)
+            return LLMResponse(text=text, provider=Provider.OPENAI, model="test")
+
+        patcher = mock.patch.object(self.brain, "_think_uncached", side_effect=answer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.brain.close)
+
+    def test_repeat_after_different_turns_misses(self):
+        self.brain.think("Tell me more")
+        self.brain.think("what?")
+        again = self.brain.think("Tell me more")
+
+        self.assertEqual(self.calls, 3)
+        self.assertNotIn("cache_hit", again.metadata)
+
+    def test_repeat_after_clear_history_hits(self):
+        first = self.brain.think("What time is it?")
+        self.brain.clear_history()
+        again = self.brain.think("what time  is it?")
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(again.text, first.text)
+        self.assertTrue(again.metadata["cache_hit"])
+        # A hit still records the exchange in history
+        self.assertEqual(self.brain.conversation_history[-1].content, first.text)
+
+    def test_restored_history_hits(self):
+        self.brain.think("Hi")
+        saved = list(self.brain.conversation_history)
+        self.brain.think("What time is it?")
+
+        # A swapped-in context is a different request...
+        self.brain.conversation_history = []
+        self.brain.think("What time is it?")
+        self.assertEqual(self.calls, 3)
+
+        # ...and restoring the original one brings the cached answer back
+        self.brain.conversation_history = saved
+        again = self.brain.think("What time is it?")
+        self.assertEqual(self.calls, 3)
+        self.assertTrue(again.metadata["cache_hit"])
+
+
+class GeminiStreamingTest(unittest.TestCase):
+    """Gemini text streams through think() to on_token."""
+
+    def setUp(self):
+        fastapi_poe = types.ModuleType("fastapi_poe")
+        fastapi_poe.ProtocolMessage = lambda role, content: types.SimpleNamespace(
+            role=role, content=content
+        )
+
+        def get_bot_response(messages, bot_name, api_key):
+            yield types.SimpleNamespace(text="Hel")
+            yield types.SimpleNamespace(text="lo")
+            yield types.SimpleNamespace(text="Tell me more", is_suggested_reply=True)
+
+        fastapi_poe.get_bot_response = get_bot_response
+        for patcher in (
+            mock.patch.dict(sys.modules, {"fastapi_poe": fastapi_poe}),
+            mock.patch("core.brain.POE_API_KEY", "test"),
+            mock.patch("core.brain.OPENAI_API_KEY", None),
+            mock.patch("core.brain.ANTHROPIC_API_KEY", None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.brain = Brain()
+        self.addCleanup(self.brain.close)
+
+    def test_chain_streams_gemini_tokens(self):
+        tokens = []
+        response = self.brain.think("Hi", on_token=tokens.append)
+
+        self.assertEqual(tokens, ["Hel", "lo"])
+        self.assertEqual(response.text, "Hello")
+        self.assertEqual(response.provider, Provider.POE)
+        self.assertEqual(self.brain.conversation_history[-1].content, "Hello")
+
+
+if __name__ == "__main__":
+    unittest.main()
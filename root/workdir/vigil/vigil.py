@@ -24,9 +24,14 @@ Author: Louis (Bizy/Lazurith)
 
 import sys
 import time
+import atexit
+import queue
 import signal
+import logging
+import logging.handlers
 import threading
 from pathlib import Path
+from typing import Optional
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
@@ -37,6 +42,7 @@ from config.settings import (
     WAKE_WORDS,
     PRIMARY_USER_NAME,
     Paths,
+    extract_wake_command,
 )
 from core.listener import WakeWordListener
 from core.voice_input import VoiceInput
@@ -54,6 +60,25 @@ from core.agent_mode import AgentSystem, AgentMode
 from core.always_on_top import AlwaysOnTopInterface
 
 
+def setup_logging() -> logging.handlers.QueueListener:
+    """
+    Route module logs through a queue drained on a background thread, so the
+    audio and LLM threads never block on console writes.
+    """
+    log_queue: queue.Queue = queue.Queue(-1)
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter(f"[{BOT_NAME}] %(message)s"))
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(log_queue, console)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
 class Vigil:
     """
     The main Vigil application.
@@ -117,7 +142,8 @@ class Vigil:
 
         # State
         self.is_running = False
-        self.is_processing = False
+        # Held while a wake is handled; a second wake is dropped, not queued
+        self._wake_lock = threading.Lock()
         self._shutdown_event = threading.Event()
 
         print(f"[{BOT_NAME}] All systems initialized.")
@@ -125,11 +151,9 @@ class Vigil:
 
     def _on_wake_word_detected(self, phrase: str):
         """Handle wake word detection."""
-        if self.is_processing:
+        if not self._wake_lock.acquire(blocking=False):
             return
 
-        self.is_processing = True
-
         try:
             # Extract command from wake phrase
             command = self._extract_command(phrase)
@@ -143,22 +167,17 @@ class Vigil:
                 self._listen_for_command()
 
         finally:
-            self.is_processing = False
+            self._wake_lock.release()
+
+    def _speak(self, text: str):
+        """Speak without the listener hearing (and re-waking on) Vigil's voice."""
+        with self.listener.suppress():
+            self.voice_output.speak(text)
 
     def _extract_command(self, phrase: str) -> str:
         """Extract command from the wake phrase."""
-        phrase_lower = phrase.lower()
-
-        # Find which wake word was used
-        for wake_word in sorted(WAKE_WORDS, key=len, reverse=True):
-            if wake_word.lower() in phrase_lower:
-                idx = phrase_lower.find(wake_word.lower())
-                remaining = phrase[idx + len(wake_word):].strip()
-                # Clean up
-                remaining = remaining.strip(",.?!")
-                return remaining.strip()
-
-        return phrase
+        command = extract_wake_command(phrase)
+        return phrase if command is None else command
 
     def _acknowledge_wake(self):
         """Acknowledge that we heard the wake word."""
@@ -171,11 +190,27 @@ class Vigil:
         ]
         import random
         response = random.choice(responses)
-        self.voice_output.speak(response)
+        self._speak(response)
+
+    def _listen(self, timeout: int = 10, phrase_limit: int = 30) -> Optional[str]:
+        """
+        Hear and transcribe the user's next phrase.
+
+        While the wake word listener runs, the phrase is taken from its
+        already-open stream rather than a second capture of the device.
+        """
+        if self.listener.is_listening:
+            print(f"[{BOT_NAME}] Listening...")
+            audio = self.listener.capture_phrase(timeout=timeout, phrase_limit=phrase_limit)
+            if audio is None:
+                print(f"[{BOT_NAME}] No speech detected (timeout)")
+                return None
+            return self.voice_input.transcribe(audio)
+        return self.voice_input.listen_and_transcribe(timeout=timeout, phrase_limit=phrase_limit)
 
     def _listen_for_command(self):
         """Listen for the user's command after wake word."""
-        text = self.voice_input.listen_and_transcribe(timeout=10, phrase_limit=30)
+        text = self._listen(timeout=10, phrase_limit=30)
         if text:
             self._process_command(text)
 
@@ -235,7 +270,7 @@ Respond naturally as Vigil. Keep voice responses concise (2-4 sentences) unless
 
         if response:
             # Speak the response
-            self.voice_output.speak(response.text)
+            self._speak(response.text)
 
             # Record interaction in memory
             self.memory.record_interaction(
@@ -245,7 +280,7 @@ Respond naturally as Vigil. Keep voice responses concise (2-4 sentences) unless
             )
         else:
             error_msg = "I apologize, I'm having trouble processing that. Could you try again?"
-            self.voice_output.speak(error_msg)
+            self._speak(error_msg)
 
     def _on_listener_error(self, error: Exception):
         """Handle listener errors."""
@@ -255,19 +290,19 @@ Respond naturally as Vigil. Keep voice responses concise (2-4 sentences) unless
         """Greet the user on startup."""
         greeting = f"Vigil online. I am with you, {PRIMARY_USER_NAME}. Say my name when you need me."
         print(f"[{BOT_NAME}] {greeting}")
-        self.voice_output.speak(greeting)
+        self._speak(greeting)
 
 
     # Task Management Command Handlers
     def _handle_create_task(self, command: str):
         """Handle task creation command."""
         response_text = "I'll help you create a task. What's the task title?"
-        self.voice_output.speak(response_text)
+        self._speak(response_text)
         
         # Listen for task title
-        title = self.voice_input.listen_and_transcribe(timeout=10, phrase_limit=20)
+        title = self._listen(timeout=10, phrase_limit=20)
         if not title:
-            self.voice_output.speak("I didn't catch that. Let's try again later.")
+            self._speak("I didn't catch that. Let's try again later.")
             return
         
         # Create the task
@@ -279,7 +314,7 @@ Respond naturally as Vigil. Keep voice responses concise (2-4 sentences) unless
         )
         
         response = f"Task created: {title}. I'll help you track this."
-        self.voice_output.speak(response)
+        self._speak(response)
         self.memory.record_interaction(
             user_input=command,
             vigil_response=response,
@@ -309,7 +344,7 @@ Respond naturally as Vigil. Keep voice responses concise (2-4 sentences) unless
                 task_names = ", ".join([t.title for t in urgent_tasks[:3]])
                 response += f" Urgent: {task_names}."
         
-        self.voice_output.speak(response)
+        self._speak(response)
         self.memory.record_interaction(
             user_input=command,
             vigil_response=response,
@@ -336,7 +371,7 @@ Respond naturally as Vigil. Keep voice responses concise (2-4 sentences) unless
             current_mode = self.agent_system.get_mode().value
             response = f"Current agent mode: {current_mode}. Say passive, active, autonomous, or project manager to change."
         
-        self.voice_output.speak(response)
+        self._speak(response)
         self.memory.record_interaction(
             user_input=command,
             vigil_response=response,
@@ -346,9 +381,9 @@ Respond naturally as Vigil. Keep voice responses concise (2-4 sentences) unless
     def _handle_show_interface(self):
         """Handle showing the always-on-top interface."""
         if self.always_on_top_interface is None or not self.always_on_top_interface.is_running:
-            def handle_interface_message(msg: str) -> str:
-                # Process message through brain
-                response = self.brain.think(msg)
+            def handle_interface_message(msg: str, on_token) -> str:
+                # Process message through brain, streaming into the window
+                response = self.brain.think(msg, on_token=on_token)
                 return response.text if response else "I'm having trouble processing that."
             
             def handle_interface_close():
@@ -356,7 +391,8 @@ Respond naturally as Vigil. Keep voice responses concise (2-4 sentences) unless
             
             self.always_on_top_interface = AlwaysOnTopInterface(
                 on_message_callback=handle_interface_message,
-                on_close_callback=handle_interface_close
+                on_close_callback=handle_interface_close,
+                stream_responses=True
             )
             self.always_on_top_interface.start()
             
@@ -364,20 +400,20 @@ Respond naturally as Vigil. Keep voice responses concise (2-4 sentences) unless
         else:
             response = "Interface is already open."
         
-        self.voice_output.speak(response)
+        self._speak(response)
     
     def _handle_add_connector(self, command: str):
         """Handle adding a service connector."""
         response_text = "Which service would you like to connect? For example: GitHub, Taskade, or a custom URL."
-        self.voice_output.speak(response_text)
+        self._speak(response_text)
         
-        service_name = self.voice_input.listen_and_transcribe(timeout=10, phrase_limit=10)
+        service_name = self._listen(timeout=10, phrase_limit=10)
         if not service_name:
-            self.voice_output.speak("I didn't catch that. Let's try again later.")
+            self._speak("I didn't catch that. Let's try again later.")
             return
         
         response = f"To connect to {service_name}, you'll need to add API credentials to your environment configuration. Check the connector manager settings."
-        self.voice_output.speak(response)
+        self._speak(response)
         
         self.memory.record_interaction(
             user_input=command,
@@ -398,7 +434,7 @@ Respond naturally as Vigil. Keep voice responses concise (2-4 sentences) unless
         
         response += f" I can connect to: {', '.join(platforms[:5])} and more."
         
-        self.voice_output.speak(response)
+        self._speak(response)
     def run(self):
         """Main run loop."""
         self.is_running = True
@@ -409,6 +445,11 @@ Respond naturally as Vigil. Keep voice responses concise (2-4 sentences) unless
         # Start wake word listener
         self.listener.start()
 
+        # Let it sample the room before Vigil speaks, or the greeting
+        # becomes the ambient noise level
+        if not self.listener.calibrated.wait(timeout=5):
+            print(f"[{BOT_NAME}] Microphone calibration is taking longer than expected.")
+
         # Greet user
         self._startup_greeting()
 
@@ -439,16 +480,20 @@ Respond naturally as Vigil. Keep voice responses concise (2-4 sentences) unless
         # Stop components
         self.listener.stop()
         self.reflection_system.stop_scheduler()
+        self.brain.close()
+        self.memory.close()
 
         # Farewell
         farewell = f"Until next time, {PRIMARY_USER_NAME}. Stay vigilant."
-        self.voice_output.speak(farewell)
+        self._speak(farewell)
 
         print(f"[{BOT_NAME}] Goodbye.")
 
 
 def main():
     """Entry point."""
+    setup_logging()
+
     # Handle Ctrl+C gracefully
     vigil = Vigil()
 